@@ -0,0 +1,275 @@
+import contextlib
+import glob
+import io
+import os
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from extraction_cache import ExtractionCache, file_content_hash
+import instrumentation
+from instrumentation import METRICS, count, progress, stage
+from pdf_extractor import extract_part_numbers, extract_pdf_data, parse_specifications, process_tables
+from pdf_pages import DEFAULT_TEXT_BACKEND, TEXT_BACKENDS, default_workers
+from stream_writer import StreamingExcelWriter
+
+DOCUMENT_COLUMNS = ['Source', 'File', 'Series', 'Status', 'Error', 'Pages', 'Tables',
+                    'Part Numbers', 'Content Hash', 'Extracted At']
+SPECIFICATION_COLUMNS = ['Source', 'Series', 'Specification_Type', 'Value']
+PART_NUMBER_COLUMNS = ['Source', 'Series', 'Part_Number']
+TABLE_CELL_COLUMNS = ['Source', 'Series', 'Page', 'Table_Index', 'Row', 'Column', 'Value']
+
+
+def resolve_inputs(inputs):
+    """
+    Expand directories (every *.pdf inside, recursively) and glob patterns
+    into a sorted list of PDF paths, without duplicates
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, '**', '*.pdf'), recursive=True)
+            matches += glob.glob(os.path.join(item, '**', '*.PDF'), recursive=True)
+        elif glob.has_magic(item):
+            matches = glob.glob(item, recursive=True)
+        else:
+            matches = [item]
+        paths.update(os.path.abspath(path) for path in matches)
+    return sorted(paths)
+
+
+def _series_name(pdf_path, specifications):
+    """Series named in the datasheet, or the file name when none is found"""
+    series = specifications.get('series')
+    if series:
+        return series[0]
+    return os.path.splitext(os.path.basename(pdf_path))[0]
+
+
+def _empty_result(pdf_path, error=None):
+    return {
+        'source': pdf_path,
+        'series': os.path.splitext(os.path.basename(pdf_path))[0],
+        'content_hash': None,
+        'pages': 0,
+        'specifications': {},
+        'part_numbers': [],
+        'tables': [],
+        'error': error,
+        'extracted_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def process_document(pdf_path, use_cache=True, text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+    """
+    Extract one datasheet into a plain-data result (picklable, so it can be
+    returned from a worker process).
+
+    Any error is caught and reported in the result's 'error' field instead
+    of being raised, so one bad PDF cannot abort a batch. The document's
+    own progress output is captured rather than interleaved with others'.
+    """
+    result = _empty_result(pdf_path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result['content_hash'] = file_content_hash(pdf_path)
+            cache = ExtractionCache() if use_cache else None
+            extracted_data = extract_pdf_data(pdf_path, workers=1, cache=cache,
+                                              text_backend=text_backend, strict_tables=strict_tables)
+            specifications = parse_specifications(extracted_data)
+            part_numbers = extract_part_numbers(extracted_data)
+            processed_tables = process_tables(extracted_data)
+
+        result['series'] = _series_name(pdf_path, specifications)
+        result['pages'] = len(extracted_data['text_content'])
+        result['specifications'] = specifications
+        result['part_numbers'] = part_numbers
+        result['tables'] = [{
+            'page': table['page'],
+            'table_index': table['table_index'],
+            'headers': table['headers'],
+            'rows': table['dataframe'].values.tolist()
+        } for table in processed_tables]
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    return result
+
+
+def _process_in_worker(pdf_path, use_cache, text_backend, strict_tables):
+    """Worker entry point returning the result and the worker's metrics"""
+    METRICS.reset()
+    instrumentation.set_quiet(True)
+    result = process_document(pdf_path, use_cache, text_backend, strict_tables)
+    return result, METRICS.state()
+
+
+def _process_isolated(pdf_path, use_cache, text_backend, strict_tables):
+    """Run one document in its own worker process, so a crash only fails that document"""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            return pool.submit(_process_in_worker, pdf_path, use_cache, text_backend, strict_tables).result()
+        except Exception as e:
+            return _empty_result(pdf_path, f"{type(e).__name__}: {e}"), None
+
+
+def iter_results(pdf_paths, workers=None, use_cache=True, text_backend=DEFAULT_TEXT_BACKEND,
+                 strict_tables=False):
+    """
+    Yield one result per PDF (see process_document) as documents finish.
+
+    Documents are spread over a pool of `workers` processes, one document
+    per task, with at most two tasks queued per worker so memory stays
+    bounded however many files there are. If a worker dies (e.g. on a
+    crash inside a PDF library) every document the pool still held is
+    re-run in a process of its own, so only the one that crashes fails,
+    and a fresh pool takes the rest.
+    """
+    if workers is None:
+        workers = default_workers()
+    workers = max(1, min(workers, len(pdf_paths)))
+
+    if workers == 1:
+        for pdf_path in pdf_paths:
+            yield process_document(pdf_path, use_cache, text_backend, strict_tables)
+        return
+
+    pending = list(reversed(pdf_paths))
+    while pending:
+        suspects = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+            while (pending or in_flight) and not suspects:
+                while pending and len(in_flight) < workers * 2:
+                    pdf_path = pending.pop()
+                    future = pool.submit(_process_in_worker, pdf_path, use_cache, text_backend, strict_tables)
+                    in_flight[future] = pdf_path
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf_path = in_flight.pop(future)
+                    try:
+                        result, worker_metrics = future.result()
+                    except Exception:
+                        suspects.append(pdf_path)
+                        continue
+                    METRICS.merge(worker_metrics)
+                    yield result
+            if suspects:
+                # The pool is broken; nothing still on it can finish
+                suspects.extend(in_flight.values())
+
+        for pdf_path in suspects:
+            result, worker_metrics = _process_isolated(pdf_path, use_cache, text_backend, strict_tables)
+            if worker_metrics:
+                METRICS.merge(worker_metrics)
+            yield result
+
+
+def batch_extract(inputs, workers=None, use_cache=True, text_backend=DEFAULT_TEXT_BACKEND,
+                  strict_tables=False):
+    """
+    Extract every PDF named by `inputs` (files, directories or globs).
+    Returns the per-document results in input order.
+    """
+    pdf_paths = resolve_inputs(inputs)
+    print(f"📚 {len(pdf_paths)} PDFs to process")
+    results = {}
+    with stage('batch_extract'):
+        for result in iter_results(pdf_paths, workers, use_cache, text_backend, strict_tables):
+            results[result['source']] = result
+            if result['error']:
+                count('documents_failed')
+                print(f"   ❌ {os.path.basename(result['source'])}: {result['error']}")
+            else:
+                count('documents_extracted')
+                progress(f"   ✅ {os.path.basename(result['source'])}: {result['pages']} pages, "
+                         f"{len(result['tables'])} tables, {len(result['part_numbers'])} part numbers")
+    return [results[pdf_path] for pdf_path in pdf_paths]
+
+
+def save_catalog(results, filename):
+    """
+    Write the consolidated catalog: one row per document plus every
+    specification, part number and table cell, each tagged with its source
+    """
+    print(f"💾 Saving consolidated catalog: {filename}")
+    with StreamingExcelWriter(filename) as writer:
+        writer.write_sheet('Documents', DOCUMENT_COLUMNS, [(
+            (r['source'], os.path.basename(r['source']), r['series'],
+             'failed' if r['error'] else 'ok', r['error'], r['pages'], len(r['tables']),
+             len(r['part_numbers']), r['content_hash'], r['extracted_at'])
+            for r in results)])
+        writer.write_sheet('Specifications', SPECIFICATION_COLUMNS, [(
+            (r['source'], r['series'], spec_type, value)
+            for r in results
+            for spec_type, values in r['specifications'].items()
+            for value in values)])
+        writer.write_sheet('Part_Numbers', PART_NUMBER_COLUMNS, [(
+            (r['source'], r['series'], part)
+            for r in results
+            for part in r['part_numbers'])])
+        # Tables differ in shape between datasheets, so cells are stored long-form
+        writer.write_sheet('Table_Cells', TABLE_CELL_COLUMNS, [(
+            (r['source'], r['series'], table['page'], table['table_index'], row_idx + 1, header, value)
+            for r in results
+            for table in r['tables']
+            for row_idx, row in enumerate(table['rows'])
+            for header, value in zip(table['headers'], row)
+            if value is not None and value != '')])
+    return filename
+
+
+def main(inputs, output=None, workers=None, use_cache=True, text_backend=DEFAULT_TEXT_BACKEND,
+         strict_tables=False):
+    """
+    Extract a directory or glob of datasheets into one consolidated catalog
+    """
+    print("🚀 Starting Batch PDF Extraction")
+    print("="*50)
+
+    results = batch_extract(inputs, workers=workers, use_cache=use_cache,
+                            text_backend=text_backend, strict_tables=strict_tables)
+    if not results:
+        print("❌ No PDFs found")
+        return None
+
+    if output is None:
+        output = f"Batch_Catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    save_catalog(results, output)
+
+    failed = [r for r in results if r['error']]
+    print("\n" + "="*50)
+    print("✅ BATCH EXTRACTION COMPLETE!")
+    print("="*50)
+    print(f"📁 Output file: {output}")
+    print(f"📄 Documents: {len(results) - len(failed)} extracted, {len(failed)} failed")
+    print(f"📊 Tables found: {sum(len(r['tables']) for r in results)}")
+    print(f"🔢 Part numbers found: {sum(len(r['part_numbers']) for r in results)}")
+    if failed:
+        print("\n⚠️ Failed documents:")
+        for r in failed:
+            print(f"  • {r['source']}: {r['error']}")
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract many datasheet PDFs into one catalog")
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('--output', help="consolidated catalog file (default: timestamped xlsx)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="documents extracted in parallel (0 = all cores, 1 = serial)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="re-extract every page instead of using the extraction cache")
+    parser.add_argument('--text-backend', choices=TEXT_BACKENDS, default=DEFAULT_TEXT_BACKEND,
+                        help="page text extractor: pdfplumber (layout-aware) or pypdf2 (faster)")
+    parser.add_argument('--strict-tables', action='store_true',
+                        help="extract tables on every page (disable the table prefilter)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    main(args.inputs, output=args.output, workers=args.workers or None, use_cache=not args.no_cache,
+         text_backend=args.text_backend, strict_tables=args.strict_tables)
+    instrumentation.finish(args)
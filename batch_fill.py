@@ -0,0 +1,89 @@
+from compiled_template import compile_template
+from instrumentation import count, timed
+from lazy_imports import lazy_import
+from part_index import get_part_index
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+@timed('fill')
+def batch_fill_template(part_numbers, template, catalog, column_map=None, constant_map=None,
+                        part_number_param=None, part_column=None, separator=None,
+                        index=None, partial=True):
+    """
+    Fill the template for many part numbers at once.
+
+    All part numbers are resolved against the catalog in one vectorized
+    join, then the template is broadcast to one block per found part and
+    each mapped parameter row is filled with a strided array assignment
+    (CompiledTemplate.fill_many). The result is the same long-format frame
+    the per-part fillers build with template.copy() and pd.concat, without
+    a Python loop per part.
+
+    template: DataFrame or CompiledTemplate; callers filling in chunks
+              should compile it once (with constant_map as its constants)
+    column_map: template parameter -> catalog column ('' if the column is missing)
+    constant_map: template parameter -> constant value
+    part_number_param: template parameter that receives the part number
+    part_column: if given, a leading column holding the part number on each row
+    separator: optional DataFrame (template columns) inserted between parts
+    partial: allow prefix matches for part numbers not found exactly
+
+    Returns (filled DataFrame, list of part numbers not found).
+    """
+    compiled = compile_template(template, constant_map)
+    parts, rows, missing = resolve_parts(part_numbers, catalog, index, partial)
+
+    columns = list(compiled.columns)
+    if part_column:
+        columns = [part_column] + columns
+
+    part_count = len(parts)
+    count('parts_filled', part_count)
+    count('parts_missing', len(missing))
+    if part_count == 0:
+        return pd.DataFrame(columns=columns), missing
+
+    values = mapped_values(compiled, parts, rows, catalog, column_map, part_number_param)
+    filled = compiled.fill_many(part_count, values, separator, part_column, parts)
+
+    count('rows_filled', len(filled))
+    return filled, missing
+
+
+def resolve_parts(part_numbers, catalog, index=None, partial=True):
+    """
+    Resolve part numbers against the catalog in one vectorized pass.
+    Returns (found part numbers, their catalog positions, list of part
+    numbers not found).
+    """
+    if index is None:
+        index = get_part_index(catalog)
+    requested = np.asarray(list(part_numbers), dtype=object)
+    positions = index.positions(requested, partial=partial)
+    found = positions >= 0
+    return requested[found], positions[found], requested[~found].tolist()
+
+
+def mapped_values(compiled, parts, rows, catalog, column_map=None, part_number_param=None, columns=None):
+    """
+    Values for CompiledTemplate.fill_many: each mapped parameter's catalog
+    column at rows ('' if the column is missing), and the part numbers for
+    part_number_param. columns can supply catalog columns already gathered
+    at rows (column name -> array), e.g. shared by several templates.
+    """
+    column_map = column_map or {}
+    values = {}
+    for param in compiled.parameters:
+        if param == part_number_param:
+            values[param] = parts
+        elif param in column_map:
+            column_name = column_map[param]
+            if columns is not None and column_name in columns:
+                values[param] = columns[column_name]
+            elif column_name in catalog.columns:
+                values[param] = catalog[column_name].to_numpy(dtype=object)[rows]
+            else:
+                values[param] = ''
+    return values
@@ -0,0 +1,368 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from lazy_imports import lazy_import
+from pdf_pages import DEFAULT_TEXT_BACKEND, TEXT_BACKENDS
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+PyPDF2 = lazy_import('PyPDF2')
+
+SOURCE_PDF = 'RK73H.pdf'
+BASELINE_PATH = 'benchmark_baseline.json'
+
+BENCHMARKS = ('extract', 'lookup', 'fill', 'fill_per_part', 'write', 'fanout')
+
+# Metrics compared against the baseline: throughputs must not drop and
+# peak memory must not grow by more than the threshold
+HIGHER_IS_BETTER = ('pages_per_s', 'lookups_per_s', 'parts_per_s', 'rows_per_s')
+LOWER_IS_BETTER = ('peak_rss_mb',)
+
+
+# Synthetic inputs
+
+def synthetic_pdf(path, pages, source=SOURCE_PDF):
+    """Write a `pages`-page PDF made by repeating the pages of `source`"""
+    reader = PyPDF2.PdfReader(source)
+    writer = PyPDF2.PdfWriter()
+    for i in range(pages):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return path
+
+
+def synthetic_catalog(rows):
+    """
+    A `rows`-row catalog in the RK73H_Full_Data.xlsx layout, taken from the
+    RK73H part space. Beyond the size of the part space the parts repeat
+    with a '/n' suffix so part numbers stay unique.
+    """
+    from rk73h_part_space import RK73HPartSpace
+
+    space = RK73HPartSpace()
+    frames = []
+    total = 0
+    for frame in space.iter_frames():
+        frames.append(frame)
+        total += len(frame)
+        if total >= rows:
+            break
+    base = pd.concat(frames, ignore_index=True).iloc[:rows]
+    if len(base) >= rows:
+        return base
+
+    copies = [base]
+    for copy_num in range(1, -(-rows // len(base))):
+        copy = base.copy()
+        copy['Part Number'] = copy['Part Number'] + f"/{copy_num}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).iloc[:rows]
+
+
+def sample_parts(catalog, count, miss_rate=0.05, seed=0):
+    """`count` part numbers drawn from the catalog, a fraction of them unknown"""
+    rng = np.random.default_rng(seed)
+    parts = catalog['Part Number'].to_numpy(dtype=object)[rng.integers(0, len(catalog), count)]
+    misses = rng.random(count) < miss_rate
+    parts[misses] = [f"RK73H9Z XX {i:04d} ZZ" for i in range(int(misses.sum()))]
+    return parts.tolist()
+
+
+def synthetic_template():
+    """
+    The generator's default RK73H template. It is built in code, so runs
+    need no template file and stay comparable whatever test1.xlsx holds.
+    """
+    from rk73h_datasheet_generator import RK73HDataProvider
+
+    return RK73HDataProvider.create_default_template()
+
+
+# Benchmarks (each runs in a fresh process, so peak RSS is its own)
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _timed(func, repeat):
+    """Best wall time of `repeat` runs, and the last result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_extract(params):
+    from pdf_extractor import extract_pdf_data
+
+    from instrumentation import METRICS
+
+    seconds, _ = _timed(lambda: extract_pdf_data(params['pdf_path'], workers=params['workers'],
+                                                 text_backend=params['text_backend'],
+                                                 strict_tables=params['strict_tables']),
+                        params['repeat'])
+    pages = params['pages']
+    metrics = {'pages': pages, 'seconds': seconds, 'pages_per_s': pages / seconds}
+    # Time spent in the text backend vs pdfplumber's table extraction
+    state = METRICS.state()
+    for name, stage in state['stages'].items():
+        if name.startswith('extract.'):
+            metrics[name.replace('.', '_') + '_s'] = stage['seconds'] / params['repeat']
+    checked = state['counters'].get('table_prefilter.checked', 0)
+    if checked:
+        metrics['table_skip_rate'] = state['counters'].get('table_prefilter.skipped', 0) / checked
+    return metrics
+
+
+def bench_lookup(params):
+    from part_index import PartIndex
+
+    catalog = synthetic_catalog(params['catalog_rows'])
+    parts = sample_parts(catalog, params['lookups'])
+
+    start = time.perf_counter()
+    index = PartIndex(catalog)
+    build_seconds = time.perf_counter() - start
+
+    seconds, _ = _timed(lambda: index.positions(parts), params['repeat'])
+    return {'catalog_rows': len(catalog), 'lookups': len(parts), 'index_build_s': build_seconds,
+            'seconds': seconds, 'lookups_per_s': len(parts) / seconds}
+
+
+def bench_fill(params):
+    from selective_processor import get_selected_part_specs
+
+    catalog = synthetic_catalog(params['catalog_rows'])
+    parts = sample_parts(catalog, params['fill_parts'])
+    template = synthetic_template()
+
+    seconds, _ = _timed(lambda: get_selected_part_specs(parts, template, catalog), params['repeat'])
+    return {'catalog_rows': len(catalog), 'parts': len(parts), 'seconds': seconds,
+            'parts_per_s': len(parts) / seconds}
+
+
+def bench_fill_per_part(params):
+    from rk73h_datasheet_generator import fill_template_with_part_data
+    import resources
+
+    catalog = synthetic_catalog(min(params['catalog_rows'], params['per_part']))
+    parts = sample_parts(catalog, params['per_part'], miss_rate=0)
+    provider = resources.get_data_provider()
+
+    def fill_all():
+        for part in parts:
+            fill_template_with_part_data(part, provider)
+
+    seconds, _ = _timed(fill_all, params['repeat'])
+    return {'parts': len(parts), 'seconds': seconds, 'parts_per_s': len(parts) / seconds}
+
+
+def bench_write(params):
+    from batch_fill import batch_fill_template
+    from pdf_extractor import save_to_excel
+    from selective_processor import REQUIRED_PARAMETERS
+    from stream_writer import MAX_ROWS
+
+    # Each sheet has to fit within Excel's row limit
+    catalog = synthetic_catalog(min(params['catalog_rows'], MAX_ROWS - 1))
+    template = synthetic_template()
+    parts = sample_parts(catalog, min(params['fill_parts'], (MAX_ROWS - 1) // len(template)), miss_rate=0)
+    filled, _ = batch_fill_template(parts, template, catalog,
+                                    column_map=REQUIRED_PARAMETERS, part_column='Part Number')
+    datasheet = {
+        'Document_Info': {'Title': 'RK73H benchmark'},
+        'General_Specifications': {},
+        'Part_Numbers': catalog['Part Number'].tolist(),
+        'Detailed_Tables': [{'page': 1, 'dataframe': filled}],
+        '_raw_text': []
+    }
+    rows = len(catalog) + len(filled)
+    out_path = os.path.join(params['work_dir'], 'benchmark_write.xlsx')
+
+    seconds, _ = _timed(lambda: save_to_excel(datasheet, out_path), params['repeat'])
+    return {'rows': rows, 'seconds': seconds, 'rows_per_s': rows / seconds,
+            'file_mb': round(os.path.getsize(out_path) / 1e6, 1)}
+
+
+def bench_fanout(params):
+    from selective_processor import REQUIRED_PARAMETERS
+    from template_fanout import TemplateTarget, fan_out_fill
+
+    catalog = synthetic_catalog(params['catalog_rows'])
+    parts = sample_parts(catalog, params['fill_parts'], miss_rate=0)
+    template = synthetic_template()
+    # Two xlsx outputs, so their writer threads open their workbooks concurrently
+    targets = [TemplateTarget(template, os.path.join(params['work_dir'], f'benchmark_fanout_{i}.xlsx'),
+                              column_map=REQUIRED_PARAMETERS, part_column='Part Number')
+               for i in range(2)]
+
+    seconds, (written, missing) = _timed(lambda: fan_out_fill(parts, targets, catalog), params['repeat'])
+    expected = (len(parts) - len(missing)) * len(template)
+    for output, rows in written.items():
+        if rows != expected:
+            raise RuntimeError(f"{output}: {rows} rows written, expected {expected}")
+    return {'parts': len(parts), 'targets': len(targets), 'seconds': seconds,
+            'parts_per_s': len(parts) / seconds}
+
+
+def _run_one(name, params):
+    """Run one benchmark with its output silenced; returns its metrics"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        metrics = globals()['bench_' + name](params)
+    metrics['peak_rss_mb'] = _peak_rss_mb()
+    return {key: round(value, 3) if isinstance(value, float) else value
+            for key, value in metrics.items()}
+
+
+def run_benchmarks(names, params):
+    """Run the named benchmarks, each in its own spawned process"""
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in names:
+        print(f"⏱️  {name}...", end=' ', flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[name] = pool.submit(_run_one, name, params).result()
+        print(', '.join(f"{key}={value}" for key, value in results[name].items()))
+    return results
+
+
+# Baselines
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline; returns a list of regression messages
+    for metrics that got worse by more than `threshold` (a fraction)
+    """
+    regressions = []
+    for name, metrics in results.items():
+        old_metrics = baseline.get('results', {}).get(name, {})
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not old or metric not in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+                continue
+            change = (value - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = '❌' if worse > threshold else '✅'
+            print(f"  {flag} {name}.{metric}: {old} → {value} ({change:+.1%})")
+            if worse > threshold:
+                regressions.append(f"{name}.{metric} regressed {worse:.1%} (limit {threshold:.0%})")
+    return regressions
+
+
+def _report(params, results):
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {k: v for k, v in params.items() if k not in ('pdf_path', 'work_dir')},
+        'results': results
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark extraction, lookup, fill and write throughput")
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--pages', type=int, default=200, help="pages in the synthetic PDF")
+    parser.add_argument('--catalog-rows', type=int, default=100000, help="rows in the synthetic catalog")
+    parser.add_argument('--lookups', type=int, default=100000, help="part numbers to look up")
+    parser.add_argument('--fill-parts', type=int, default=10000, help="parts for the batch fill and write")
+    parser.add_argument('--per-part', type=int, default=500, help="parts for the per-part fill")
+    parser.add_argument('--workers', type=int, default=1, help="extraction worker processes")
+    parser.add_argument('--text-backend', choices=TEXT_BACKENDS, default=DEFAULT_TEXT_BACKEND,
+                        help="page text extractor for the extract benchmark")
+    parser.add_argument('--strict-tables', action='store_true',
+                        help="extract tables on every page (disable the table prefilter)")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per benchmark (best time is kept)")
+    parser.add_argument('--quick', action='store_true', help="small inputs for a fast smoke run")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed regression as a fraction (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    if args.quick:
+        args.pages, args.catalog_rows, args.lookups = 20, 10000, 10000
+        args.fill_parts, args.per_part = 1000, 100
+
+    names = [name for name in BENCHMARKS if not args.benchmarks or name in args.benchmarks]
+    work_dir = tempfile.mkdtemp(prefix='rk73h_bench_')
+    params = {
+        'pages': args.pages,
+        'catalog_rows': args.catalog_rows,
+        'lookups': args.lookups,
+        'fill_parts': args.fill_parts,
+        'per_part': args.per_part,
+        'workers': args.workers,
+        'text_backend': args.text_backend,
+        'strict_tables': args.strict_tables,
+        'repeat': args.repeat,
+        'work_dir': work_dir,
+        'pdf_path': os.path.join(work_dir, 'synthetic.pdf')
+    }
+
+    print("📊 RK73H Benchmark")
+    print("=" * 50)
+    try:
+        if 'extract' in names:
+            print(f"📄 Building {args.pages}-page synthetic PDF from {SOURCE_PDF}...")
+            synthetic_pdf(params['pdf_path'], args.pages)
+        results = run_benchmarks(names, params)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = _report(params, results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️  No baseline at {args.baseline} (use --save-baseline to create one)")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('params') != report['params']:
+        print("\n⚠️  Baseline was recorded with different parameters; comparison may not be meaningful")
+    print(f"\n📋 Compared with {args.baseline} (threshold {args.threshold:.0%}):")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import json
+import os
+import shutil
+import uuid
+
+from extraction_cache import file_content_hash
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Bump when the sidecar layout changes so older sidecars are rebuilt
+SIDECAR_FORMAT = 1
+
+
+def sidecar_dir(source_path):
+    """Directory holding the columnar sidecar of a catalog workbook"""
+    return f"{source_path}.cols"
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != SIDECAR_FORMAT:
+        return None
+    return meta
+
+
+def _write_meta(directory, meta):
+    tmp_path = os.path.join(directory, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+
+
+def _encode_column(series):
+    """
+    Turn a column into memory-mappable arrays: numeric columns are stored
+    as-is, string columns as fixed-width unicode plus a null mask
+    """
+    kind = series.dtype.kind
+    if kind in 'biuf':
+        return 'numeric', {'values': series.to_numpy()}
+    if kind == 'M':
+        return 'datetime', {'values': series.to_numpy().astype('datetime64[ns]').view('int64'),
+                            'mask': series.isna().to_numpy()}
+    mask = series.isna().to_numpy()
+    if not all(isinstance(v, str) for v in series[~mask]):
+        # Mixed-type columns keep their Python objects (not memory-mapped)
+        return 'object', {'values': series.to_numpy(dtype=object)}
+    text = series.where(~mask, '').astype(str).to_numpy()
+    width = max(1, max((len(v) for v in text), default=1))
+    return 'text', {'values': text.astype(f'<U{width}'), 'mask': mask}
+
+
+def build_sidecar(source_path, sheet_name=0, content_hash=None):
+    """
+    Convert a catalog workbook into the columnar sidecar and return the
+    catalog DataFrame read from the workbook
+    """
+    print(f"🗃️ Building columnar catalog cache for {source_path}...")
+    catalog = pd.read_excel(source_path, sheet_name=sheet_name)
+
+    stat = os.stat(source_path)
+    if content_hash is None:
+        content_hash = file_content_hash(source_path)
+
+    directory = sidecar_dir(source_path)
+    os.makedirs(directory, exist_ok=True)
+    version = uuid.uuid4().hex[:12]
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir)
+
+    columns = []
+    for i, name in enumerate(catalog.columns):
+        kind, arrays = _encode_column(catalog[name])
+        for part, array in arrays.items():
+            np.save(os.path.join(version_dir, f"col_{i}_{part}.npy"), array,
+                    allow_pickle=(kind == 'object'))
+        columns.append({'name': str(name), 'kind': kind, 'dtype': str(catalog[name].dtype)})
+
+    old_meta = _read_meta(directory)
+    _write_meta(directory, {
+        'format': SIDECAR_FORMAT,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': content_hash,
+        'sheet_name': sheet_name,
+        'version': version,
+        'rows': len(catalog),
+        'columns': columns
+    })
+
+    # Remove superseded versions
+    if old_meta and old_meta.get('version') != version:
+        shutil.rmtree(os.path.join(directory, old_meta['version']), ignore_errors=True)
+
+    return catalog
+
+
+def _current_meta(source_path, sheet_name):
+    """Sidecar metadata if it is still valid for the source workbook, else None"""
+    directory = sidecar_dir(source_path)
+    meta = _read_meta(directory)
+    if meta is None or meta.get('sheet_name') != sheet_name:
+        return None, None
+    if not os.path.isdir(os.path.join(directory, meta['version'])):
+        return None, None
+
+    stat = os.stat(source_path)
+    if meta['source_size'] == stat.st_size and meta['source_mtime_ns'] == stat.st_mtime_ns:
+        return meta, None
+
+    # Touched but possibly unchanged: fall back to the content hash
+    content_hash = file_content_hash(source_path)
+    if meta['source_sha256'] != content_hash:
+        return None, content_hash
+    meta['source_size'] = stat.st_size
+    meta['source_mtime_ns'] = stat.st_mtime_ns
+    _write_meta(directory, meta)
+    return meta, content_hash
+
+
+def open_catalog_columns(source_path, sheet_name=0):
+    """
+    Return the catalog as a dict of column name -> read-only memory-mapped
+    NumPy array (text columns as fixed-width unicode with nulls as ''),
+    building the sidecar first if it is missing or stale. Memory-mapped
+    columns are shared between processes through the OS page cache;
+    mixed-type columns are loaded into memory.
+    """
+    meta, content_hash = _current_meta(source_path, sheet_name)
+    if meta is None:
+        build_sidecar(source_path, sheet_name, content_hash)
+        meta, _ = _current_meta(source_path, sheet_name)
+
+    version_dir = os.path.join(sidecar_dir(source_path), meta['version'])
+    return {column['name']: _load_array(version_dir, i, 'values', column['kind'])
+            for i, column in enumerate(meta['columns'])}
+
+
+def _load_array(version_dir, index, part, kind):
+    path = os.path.join(version_dir, f"col_{index}_{part}.npy")
+    if kind == 'object':
+        return np.load(path, allow_pickle=True)
+    return np.load(path, mmap_mode='r')
+
+
+def load_catalog(source_path='RK73H_Full_Data.xlsx', sheet_name=0):
+    """
+    Load a catalog workbook as a DataFrame through its columnar sidecar.
+
+    The first load (or the first after the workbook changes) parses the
+    XLSX once and writes the sidecar; later loads memory-map the column
+    arrays instead of going through openpyxl. The sidecar is invalidated
+    by the workbook's size and mtime, confirmed with its content hash.
+    """
+    meta, content_hash = _current_meta(source_path, sheet_name)
+    if meta is None:
+        return build_sidecar(source_path, sheet_name, content_hash)
+
+    version_dir = os.path.join(sidecar_dir(source_path), meta['version'])
+    data = {}
+    for i, column in enumerate(meta['columns']):
+        kind = column['kind']
+        values = _load_array(version_dir, i, 'values', kind)
+        if kind == 'object':
+            series = pd.Series(values, dtype=object)
+        elif kind == 'numeric':
+            series = pd.Series(values, dtype=column['dtype'])
+        elif kind == 'datetime':
+            series = pd.Series(np.asarray(values).view('datetime64[ns]'))
+            series[np.asarray(_load_array(version_dir, i, 'mask', kind))] = pd.NaT
+        else:
+            series = pd.Series(values.astype(object))
+            series[np.asarray(_load_array(version_dir, i, 'mask', kind))] = np.nan
+        data[column['name']] = series
+
+    return pd.DataFrame(data)
@@ -0,0 +1,127 @@
+import math
+import sys
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# A text column becomes categorical when at most this share of its values are distinct
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Smaller tables keep plain object columns: below this, the per-column
+# overhead of separate blocks and category indexes outweighs the savings
+COMPACT_MIN_ROWS = 32
+
+_INT64_LIMIT = 2 ** 63
+
+
+class _Record:
+    """
+    Base for small fixed-field records. Fields are also readable as
+    record['field'], like the dicts these records replace.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class PageText(_Record):
+    """The text of one page. The text string is shared, not copied."""
+    __slots__ = ('page', 'text')
+
+    def __init__(self, page, text):
+        self.page = page
+        self.text = text
+
+
+class TableRecord(_Record):
+    """One table as extracted: rows of cells, first row the header"""
+    __slots__ = ('page', 'table_index', 'data')
+
+    def __init__(self, page, table_index, data):
+        self.page = page
+        self.table_index = table_index
+        self.data = data
+
+
+def intern_rows(rows):
+    """
+    Rows as tuples with every string cell interned, so values repeated
+    across rows and tables (sizes, codes, units) are stored once
+    """
+    intern = sys.intern
+    return [tuple(intern(cell) if type(cell) is str else cell for cell in row) for row in rows]
+
+
+def _numeric(values):
+    """
+    The values as numbers if every one is a number written in its
+    canonical form ('100', '0.25'), so nothing is lost in the conversion;
+    otherwise None
+    """
+    numbers = []
+    for value in values:
+        if type(value) is not str:
+            return None
+        try:
+            number = int(value)
+        except ValueError:
+            try:
+                number = float(value)
+            except ValueError:
+                return None
+            if not math.isfinite(number) or repr(number) != value:
+                return None
+        else:
+            if str(number) != value or abs(number) >= _INT64_LIMIT:
+                return None
+        numbers.append(number)
+    return numbers
+
+
+def infer_column(column):
+    """
+    Compact dtype for an object column of table cells: int64 or float64
+    when every value is a plain number, category when values repeat, the
+    column unchanged otherwise
+    """
+    present = column.dropna()
+    if present.empty:
+        return column
+    numbers = _numeric(present.tolist())
+    if numbers is not None:
+        if len(present) == len(column) and all(type(n) is int for n in numbers):
+            return pd.Series(numbers, index=column.index, dtype='int64')
+        converted = pd.Series(float('nan'), index=column.index, dtype='float64')
+        converted[present.index] = [float(n) for n in numbers]
+        return converted
+    if present.nunique() <= len(present) * CATEGORY_MAX_UNIQUE_RATIO:
+        return column.astype('category')
+    return column
+
+
+def compact_frame(rows, columns):
+    """
+    DataFrame of table rows, with each column stored in its inferred dtype
+    once the table has at least COMPACT_MIN_ROWS rows
+    """
+    df = pd.DataFrame(rows, columns=columns)
+    # Remove empty rows
+    df = df.dropna(how='all')
+    if len(df) < COMPACT_MIN_ROWS:
+        return df
+    for i in range(df.shape[1]):
+        df.isetitem(i, infer_column(df.iloc[:, i]))
+    return df
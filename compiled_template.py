@@ -0,0 +1,127 @@
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+class CompiledTemplate:
+    """
+    A template resolved once for repeated fills: its cells as read-only
+    object arrays, a parameter -> row slots plan, and constant fields
+    already written into the value column.
+
+    Filling a part is then a copy of the cells and one assignment per slot
+    (fill), and filling many parts one strided assignment per slot into
+    preallocated columns (fill_many). A compiled template is
+    never modified after construction, so one instance can serve any
+    number of fills from any number of threads.
+    """
+
+    def __init__(self, template, constants=None, value_column='value', parameter_column='parameter'):
+        self.value_column = value_column
+        # Like template.at[row, 'value'] on a template without the column, add it at the end
+        self.columns = list(template.columns)
+        if value_column not in self.columns:
+            self.columns.append(value_column)
+        self.size = len(template)
+
+        self.slots = {}
+        for row, param in enumerate(template[parameter_column].tolist()):
+            if pd.notna(param):
+                self.slots.setdefault(param, []).append(row)
+        self.slots = {param: tuple(rows) for param, rows in self.slots.items()}
+
+        self.constants = dict(constants or {})
+        # One object block (rows x columns): a DataFrame is built from it
+        # far faster than from a dict of columns
+        self._block = np.full((self.size, len(self.columns)), np.nan, dtype=object)
+        for i, col in enumerate(self.columns):
+            if col in template.columns:
+                self._block[:, i] = template[col].to_numpy(dtype=object)
+        self._value_index = self.columns.index(value_column)
+        self._assign(self._block[:, self._value_index], self.constants)
+        self._block.flags.writeable = False
+        self._columns = [self._block[:, i].copy() for i in range(len(self.columns))]
+        for values in self._columns:
+            values.flags.writeable = False
+
+    @classmethod
+    def load(cls, path, constants=None):
+        """Compile a template file, normalizing a 'value ' column name as the fillers do"""
+        template = pd.read_excel(path)
+        if 'value ' in template.columns:
+            template = template.rename(columns={'value ': 'value'})
+        return cls(template, constants)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, param):
+        return param in self.slots
+
+    @property
+    def parameters(self):
+        """Template parameters, in template order"""
+        return list(self.slots)
+
+    def column(self, name):
+        """Read-only array of a template column, constants included"""
+        return self._columns[self.columns.index(name)]
+
+    def _assign(self, values, assignments, block=None):
+        for param, value in assignments.items():
+            for row in self.slots.get(param, ()):
+                if block is None:
+                    values[row] = value
+                else:
+                    values[row::block] = value
+
+    def fill(self, values):
+        """
+        The template filled for one part: values maps template parameters
+        to their values (parameters not in the template are ignored).
+        """
+        block = self._block.copy()
+        self._assign(block[:, self._value_index], values)
+        return pd.DataFrame(block, columns=self.columns)
+
+    def fill_many(self, part_count, values, separator=None, part_column=None, parts=None):
+        """
+        The template filled for part_count parts, one block after another,
+        with the rows of separator (a DataFrame with the template columns)
+        between blocks.
+
+        values maps template parameters to a scalar for every part or an
+        array with one value per part. If part_column is given, a leading
+        column of that name holds each block's entry of parts.
+        """
+        sep_rows = len(separator) if separator is not None else 0
+        block = self.size + sep_rows
+        total = part_count * block - sep_rows
+
+        filled = {}
+        for col, pattern in zip(self.columns, self._columns):
+            if sep_rows:
+                pattern = np.concatenate([pattern, separator[col].to_numpy(dtype=object)])
+            filled[col] = np.tile(pattern, part_count)[:total]
+
+        # Row r of part k lives at k * block + r
+        self._assign(filled[self.value_column], values, block)
+
+        columns = self.columns
+        if part_column:
+            part_values = np.repeat(np.asarray(parts, dtype=object), block)[:total]
+            if sep_rows:
+                part_values[(np.arange(total) % block) >= self.size] = ''
+            filled = {part_column: part_values, **filled}
+            columns = [part_column] + columns
+        return pd.DataFrame(filled, columns=columns)
+
+
+def compile_template(template, constants=None):
+    """template as a CompiledTemplate (returned as is if it already is one)"""
+    if isinstance(template, CompiledTemplate):
+        if constants:
+            raise ValueError("constants must be given when the template is compiled")
+        return template
+    return CompiledTemplate(template, constants)
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from extraction_cache import ExtractionCache, file_content_hash
+import instrumentation
+from instrumentation import count, progress, timed
+from lazy_imports import lazy_import
+from pdf_pages import DEFAULT_TEXT_BACKEND, TEXT_BACKENDS, extractor_version
+
+PyPDF2 = lazy_import('PyPDF2')
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST = 'corpus_manifest.json'
+
+
+def _hash_stream(digest, obj):
+    digest.update(obj.get_data() if hasattr(obj, 'get_data') else repr(obj).encode('utf-8'))
+
+
+def _hash_resources(digest, resources, seen):
+    """
+    Add what text extraction reads from a resource dictionary: each font's
+    name, type, encoding and ToUnicode map, and each form XObject's stream
+    and own resources (forms drawn with Do are page content too)
+    """
+    resources = resources.get_object() if resources else None
+    if not resources:
+        return
+    fonts = resources.get('/Font')
+    if fonts:
+        for name, font in sorted(fonts.get_object().items()):
+            font = font.get_object()
+            digest.update(f"{name}:{font.get('/BaseFont')}:{font.get('/Subtype')}".encode('utf-8'))
+            encoding = font.get('/Encoding')
+            if encoding is not None:
+                _hash_stream(digest, encoding.get_object())
+            to_unicode = font.get('/ToUnicode')
+            if to_unicode is not None:
+                _hash_stream(digest, to_unicode.get_object())
+    xobjects = resources.get('/XObject')
+    if xobjects:
+        for name, ref in sorted(xobjects.get_object().items()):
+            xobject = ref.get_object()
+            digest.update(f"{name}:{xobject.get('/Subtype')}".encode('utf-8'))
+            if xobject.get('/Subtype') != '/Form':
+                continue
+            # A form drawn from several places (or from itself) is hashed once
+            key = getattr(ref, 'idnum', None) or id(xobject)
+            if key in seen:
+                continue
+            seen.add(key)
+            _hash_stream(digest, xobject)
+            digest.update(repr(xobject.get('/Matrix')).encode('utf-8'))
+            _hash_resources(digest, xobject.get('/Resources'), seen)
+
+
+def _page_hash(page):
+    """
+    Hash of what a page's extraction depends on: its content stream, its
+    page box, its fonts (which decide how glyphs map to text) and the form
+    XObjects it draws, recursively
+    """
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        streams = contents if isinstance(contents, list) else [contents]
+        for stream in streams:
+            digest.update(stream.get_object().get_data())
+    digest.update(repr([float(v) for v in page.mediabox]).encode('utf-8'))
+    _hash_resources(digest, page.get('/Resources'), set())
+    return digest.hexdigest()
+
+
+@timed('page_hashes')
+def page_hashes(pdf_path):
+    """Content hash of every page, in page order"""
+    reader = PyPDF2.PdfReader(pdf_path)
+    return [_page_hash(page) for page in reader.pages]
+
+
+def datasheet_fingerprint(datasheet):
+    """
+    Hash of a datasheet's extracted content (see pdf_extractor), ignoring
+    the extraction date, so an unchanged output is recognised before it
+    is written
+    """
+    info = {key: value for key, value in datasheet['Document_Info'].items() if key != 'Extraction_Date'}
+    content = {
+        'info': info,
+        'specifications': datasheet['General_Specifications'],
+        'part_numbers': datasheet['Part_Numbers'],
+        'tables': [(t['page'], t['headers'], t['dataframe'].values.tolist())
+                   for t in datasheet['Detailed_Tables']],
+        'text': [(item['page'], item['text']) for item in datasheet.get('_raw_text', [])]
+    }
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+
+def datasheet_filename(pdf_path, output_dir='.'):
+    """Stable (untimestamped) output path for a PDF's datasheet"""
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(output_dir, f"{stem}_Complete_Datasheet.xlsx")
+
+
+class CorpusManifest:
+    """
+    JSON record of every PDF extracted so far: its size, modification
+    time, content hash and per-page hashes, the extractor version used,
+    and the output written from it with that output's content fingerprint.
+
+    Paths are stored relative to the manifest, so the corpus and manifest
+    can be moved together.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST):
+        self.path = path
+        self.documents = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.documents = data.get('documents', {})
+
+    def _key(self, pdf_path):
+        base = os.path.dirname(os.path.abspath(self.path))
+        return os.path.relpath(os.path.abspath(pdf_path), base)
+
+    def get(self, pdf_path):
+        return self.documents.get(self._key(pdf_path))
+
+    def put(self, pdf_path, entry):
+        self.documents[self._key(pdf_path)] = entry
+
+    def remove(self, pdf_path):
+        return self.documents.pop(self._key(pdf_path), None)
+
+    def paths(self):
+        """Absolute paths of every PDF in the manifest"""
+        base = os.path.dirname(os.path.abspath(self.path))
+        return [os.path.normpath(os.path.join(base, key)) for key in self.documents]
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'documents': self.documents}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def seed_page_cache(cache, old_entry, content_hash, hashes, version):
+    """
+    Copy cached records of pages whose content is unchanged from the PDF's
+    previous version to the new version's cache keys, so only the changed
+    pages are extracted again. Pages are matched by hash, so inserted or
+    reordered pages are still reused. Returns the number of pages reused.
+    """
+    old_pages = {}
+    for page_num, page_hash in enumerate(old_entry['page_hashes'], 1):
+        old_pages.setdefault(page_hash, page_num)
+
+    reused = 0
+    for page_num, page_hash in enumerate(hashes, 1):
+        old_page = old_pages.get(page_hash)
+        if old_page is None or cache.get_page(content_hash, page_num, version) is not None:
+            continue
+        record = cache.get_page(old_entry['content_hash'], old_page, version)
+        if record is None:
+            continue
+        record['page'] = page_num
+        cache.put_page(content_hash, page_num, version, record)
+        reused += 1
+    cache.put_page_count(content_hash, version, len(hashes))
+    return reused
+
+
+def refresh_document(pdf_path, manifest, cache, output_dir='.', workers=1,
+                     text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+    """
+    Bring one PDF's datasheet up to date. Returns 'unchanged' (nothing
+    done), 'same output' (re-extracted, but the output was identical and
+    was not rewritten) or 'written'.
+    """
+    from pdf_extractor import (create_comprehensive_datasheet, extract_part_numbers, extract_pdf_data,
+                               parse_specifications, process_tables, save_to_excel)
+
+    name = os.path.basename(pdf_path)
+    stat = os.stat(pdf_path)
+    version = extractor_version(text_backend, strict_tables)
+    entry = manifest.get(pdf_path)
+    output = datasheet_filename(pdf_path, output_dir)
+    current = (entry is not None and entry['extractor_version'] == version
+               and entry['output'] == output and os.path.exists(output))
+
+    # Same size and modification time: trust the manifest without hashing
+    if current and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+        progress(f"   ⏭️ {name}: unchanged")
+        return 'unchanged'
+
+    content_hash = file_content_hash(pdf_path)
+    if current and entry['content_hash'] == content_hash:
+        entry.update(size=stat.st_size, mtime=stat.st_mtime)
+        progress(f"   ⏭️ {name}: unchanged (touched)")
+        return 'unchanged'
+
+    hashes = page_hashes(pdf_path)
+    if entry is not None and entry['extractor_version'] == version:
+        reused = seed_page_cache(cache, entry, content_hash, hashes, version)
+        count('pages_reused', reused)
+        old_hashes = set(entry['page_hashes'])
+        changed = sum(1 for page_hash in hashes if page_hash not in old_hashes)
+        print(f"   🔄 {name}: {changed} of {len(hashes)} pages changed, {reused} reused")
+    else:
+        print(f"   🆕 {name}: extracting {len(hashes)} pages")
+
+    extracted_data = extract_pdf_data(pdf_path, workers=workers, cache=cache,
+                                      text_backend=text_backend, strict_tables=strict_tables)
+    specifications = parse_specifications(extracted_data)
+    part_numbers = extract_part_numbers(extracted_data)
+    processed_tables = process_tables(extracted_data)
+    datasheet = create_comprehensive_datasheet(extracted_data, specifications, part_numbers, processed_tables)
+    datasheet['_raw_text'] = extracted_data['text_content']
+
+    fingerprint = datasheet_fingerprint(datasheet)
+    if (entry is not None and entry.get('output_hash') == fingerprint
+            and entry['output'] == output and os.path.exists(output)):
+        status = 'same output'
+        progress(f"   ⏭️ {name}: output unchanged, not rewritten")
+    else:
+        save_to_excel(datasheet, output)
+        status = 'written'
+
+    manifest.put(pdf_path, {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'content_hash': content_hash,
+        'page_hashes': hashes,
+        'extractor_version': version,
+        'output': output,
+        'output_hash': fingerprint,
+        'updated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    })
+    return status
+
+
+def refresh(inputs, manifest_path=DEFAULT_MANIFEST, output_dir='.', workers=1,
+            text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False, cache=None):
+    """
+    Incrementally re-extract a corpus (files, directories or globs; see
+    batch_extract.resolve_inputs): only new or changed PDFs are extracted,
+    only their changed pages are re-parsed, and outputs whose content is
+    identical are not rewritten. Returns {status: count}.
+    """
+    from batch_extract import resolve_inputs
+
+    manifest = CorpusManifest(manifest_path)
+    cache = cache or ExtractionCache()
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_paths = resolve_inputs(inputs)
+    print(f"📚 {len(pdf_paths)} PDFs, {len(manifest.documents)} in manifest {manifest_path}")
+
+    summary = {}
+    for pdf_path in pdf_paths:
+        try:
+            status = refresh_document(pdf_path, manifest, cache, output_dir, workers,
+                                      text_backend, strict_tables)
+        except Exception as e:
+            print(f"   ❌ {os.path.basename(pdf_path)}: {e}")
+            status = 'failed'
+        summary[status] = summary.get(status, 0) + 1
+        count(f"documents_{status.replace(' ', '_')}")
+        # Saved after every extraction, so an interrupted run keeps its progress
+        if status != 'unchanged':
+            manifest.save()
+
+    # Forget PDFs that no longer exist (their outputs are left in place)
+    for path in manifest.paths():
+        if not os.path.exists(path):
+            manifest.remove(path)
+            summary['removed'] = summary.get('removed', 0) + 1
+    manifest.save()
+
+    print("📋 " + ", ".join(f"{status}: {n}" for status, n in sorted(summary.items())))
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally re-extract a corpus of datasheet PDFs")
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help="manifest file to read and update")
+    parser.add_argument('--output-dir', default='.', help="directory for the datasheet workbooks")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes for page extraction (0 = all cores, 1 = serial)")
+    parser.add_argument('--text-backend', choices=TEXT_BACKENDS, default=DEFAULT_TEXT_BACKEND,
+                        help="page text extractor: pdfplumber (layout-aware) or pypdf2 (faster)")
+    parser.add_argument('--strict-tables', action='store_true',
+                        help="extract tables on every page (disable the table prefilter)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    refresh(args.inputs, manifest_path=args.manifest, output_dir=args.output_dir,
+            workers=args.workers or None, text_backend=args.text_backend, strict_tables=args.strict_tables)
+    instrumentation.finish(args)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+
+DEFAULT_CACHE_DIR = '.extraction_cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def file_content_hash(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of per-page extraction results.
+
+    Entries are keyed by the PDF's content hash, the page number and the
+    extractor version, so a renamed or copied file still hits the cache and
+    an edited file or a new extractor version never does. When the cache
+    grows past max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, content_hash, key, version):
+        name = hashlib.sha256(f"{content_hash}:{key}:{version}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name[:2], name + '.json')
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Refresh the access time so eviction keeps recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _write(self, path, value):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get_page(self, content_hash, page_num, version):
+        """Return the cached record for a page, or None on a miss"""
+        record = self._read(self._entry_path(content_hash, f"page:{page_num}", version))
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return record
+
+    def put_page(self, content_hash, page_num, version, record):
+        """Store the record for a page"""
+        self._write(self._entry_path(content_hash, f"page:{page_num}", version), record)
+
+    def get_page_count(self, content_hash, version):
+        """Return the cached page count of a document, or None"""
+        value = self._read(self._entry_path(content_hash, 'page_count', version))
+        return value.get('page_count') if value else None
+
+    def put_page_count(self, content_hash, version, page_count):
+        """Store the page count of a document"""
+        self._write(self._entry_path(content_hash, 'page_count', version),
+                    {'page_count': page_count})
+
+    def size(self):
+        """Total size in bytes of all cache entries"""
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        Returns the number of entries removed.
+        """
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        for _, path, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import math
+from urllib.parse import parse_qs, urlsplit
+
+from batch_fill import batch_fill_template
+from compiled_template import compile_template
+from lazy_imports import lazy_import
+import resources
+from selective_processor import REQUIRED_PARAMETERS
+
+np = lazy_import('numpy')
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# POST /lookup batches up to this size are resolved on the event loop; larger ones in the thread pool
+INLINE_LOOKUP_MAX = 64
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _jsonable(value):
+    """Convert NumPy scalars and NaN to plain JSON values"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _records(df):
+    columns = list(df.columns)
+    return [{col: _jsonable(v) for col, v in zip(columns, row)}
+            for row in df.itertuples(index=False, name=None)]
+
+
+class FillService:
+    """
+    Long-running lookup/fill service that keeps the catalog warm.
+
+    The catalog, template, part index and parametric search index are
+    loaded once at start. Single part lookups arriving within batch_window
+    seconds of each other (or in the same event loop iteration) are
+    resolved together in one index pass; fills run in a thread pool, at
+    most max_concurrency at a time, so the event loop stays responsive.
+    """
+
+    def __init__(self, catalog_path=resources.CATALOG_PATH, template_path=resources.TEMPLATE_PATH,
+                 required_params=REQUIRED_PARAMETERS, max_concurrency=4,
+                 batch_window=0, max_batch=1024):
+        self.catalog_path = catalog_path
+        self.template_path = template_path
+        self.required_params = required_params
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_concurrency = max_concurrency
+        self._fill_slots = None
+        self._pending = []
+        self._flush_handle = None
+
+    def load(self):
+        """Load the catalog, template, part index and parametric search index"""
+        print("📂 Loading catalog, template and indexes...")
+        self.catalog = resources.get_catalog(self.catalog_path)
+        self.index = resources.get_part_index(self.catalog_path)
+        # Built here, not on the first search, so that search does not stall the event loop
+        self.search_index = resources.get_parametric_index(self.catalog_path)
+        template = resources.get_template(self.template_path)
+        if 'value ' in template.columns:
+            template = template.rename(columns={'value ': 'value'})
+        self.template = compile_template(template)
+        self._column_values = [(col, self.catalog[col].to_numpy()) for col in self.catalog.columns]
+        print(f"✅ Ready: {len(self.catalog)} catalog rows, {len(self.index)} part numbers")
+
+    # Lookups
+
+    def _row(self, pos):
+        return {col: _jsonable(values[pos]) for col, values in self._column_values}
+
+    def lookup_many(self, part_numbers, partial=True):
+        """Resolve part numbers to catalog rows (dict or None) in one pass"""
+        if len(part_numbers) < 64:
+            # Small batches: plain dict lookups beat building a vectorized pass
+            positions = [self.index.position(part, partial=partial) for part in part_numbers]
+        else:
+            positions = [pos if pos >= 0 else None
+                         for pos in self.index.positions(part_numbers, partial=partial).tolist()]
+        return [self._row(pos) if pos is not None else None for pos in positions]
+
+    async def lookup(self, part_number):
+        """Resolve one part number; concurrent calls are batched together"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((part_number, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_lookups()
+        elif self._flush_handle is None:
+            if self.batch_window > 0:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush_lookups)
+            else:
+                # Batch whatever arrives within the current event loop iteration
+                self._flush_handle = loop.call_soon(self._flush_lookups)
+        return await future
+
+    def _flush_lookups(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            rows = self.lookup_many([part for part, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), row in zip(pending, rows):
+            if not future.done():
+                future.set_result(row)
+
+    # Fills
+
+    def fill_many(self, part_numbers, required_params=None):
+        """Fill the template for many parts; returns (records, missing)"""
+        filled, missing = batch_fill_template(
+            part_numbers, self.template, self.catalog,
+            column_map=required_params or self.required_params,
+            part_column='Part Number',
+            index=self.index
+        )
+        return _records(filled), missing
+
+    async def fill(self, part_numbers, required_params=None):
+        """Run a batch fill in the thread pool, limited to max_concurrency at once"""
+        if self._fill_slots is None:
+            self._fill_slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._fill_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.fill_many, part_numbers, required_params)
+
+    # Parametric search
+
+    def search(self, criteria):
+        """Catalog positions matching a query string or criteria dict (see parametric_search)"""
+        return self.search_index.positions(criteria)
+
+    # HTTP
+
+    async def handle_request(self, method, target, body):
+        """Dispatch one request; returns (status, payload)"""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        payload = json.loads(body) if body else {}
+        if not isinstance(payload, dict):
+            return 400, {'error': 'expected a JSON object body'}
+
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'catalog_rows': len(self.catalog)}
+
+        if url.path == '/lookup':
+            if method == 'GET':
+                parts = query.get('part', [])
+                if len(parts) != 1:
+                    return 400, {'error': "expected one 'part' query parameter"}
+                row = await self.lookup(parts[0])
+                return 200, {'part': parts[0], 'found': row is not None, 'row': row}
+            if method == 'POST':
+                parts = payload.get('parts')
+                if not isinstance(parts, list):
+                    return 400, {'error': "expected a JSON body with a 'parts' list"}
+                partial = payload.get('partial', True)
+                if len(parts) <= INLINE_LOOKUP_MAX:
+                    rows = self.lookup_many(parts, partial=partial)
+                else:
+                    # Large batches run in the thread pool, so the event loop stays responsive
+                    loop = asyncio.get_running_loop()
+                    rows = await loop.run_in_executor(None, self.lookup_many, parts, partial)
+                return 200, {'results': [{'part': p, 'found': r is not None, 'row': r}
+                                         for p, r in zip(parts, rows)]}
+            return 405, {'error': 'use GET or POST'}
+
+        if url.path == '/fill':
+            if method != 'POST':
+                return 405, {'error': 'use POST'}
+            parts = payload.get('parts')
+            if not isinstance(parts, list):
+                return 400, {'error': "expected a JSON body with a 'parts' list"}
+            params = payload.get('params')
+            if params is not None and not (isinstance(params, dict) and all(
+                    isinstance(k, str) and isinstance(v, str) for k, v in params.items())):
+                return 400, {'error': "'params' must be an object mapping template parameters to catalog columns"}
+            rows, missing = await self.fill(parts, params)
+            return 200, {'rows': rows, 'missing': missing}
+
+        if url.path == '/search':
+            if method == 'GET':
+                criteria = query.get('q', [''])[0]
+                limit = query.get('limit', [100])[0]
+                if isinstance(limit, str) and limit.isdigit():
+                    limit = int(limit)
+            elif method == 'POST':
+                criteria = payload.get('query', payload.get('criteria'))
+                limit = payload.get('limit', 100)
+            else:
+                return 405, {'error': 'use GET or POST'}
+            if not isinstance(criteria, (str, dict)):
+                return 400, {'error': "expected a 'query' string or a 'criteria' object"}
+            if type(limit) is not int or limit < 0:
+                return 400, {'error': "'limit' must be a non-negative integer"}
+            try:
+                positions = self.search(criteria)
+            except (TypeError, ValueError) as e:
+                return 400, {'error': str(e)}
+            return 200, {'count': len(positions),
+                         'rows': [self._row(pos) for pos in positions[:limit].tolist()]}
+
+        return 404, {'error': f'unknown path {url.path}'}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one (keep-alive) connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'malformed request line'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'error': 'invalid Content-Length'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': 'request body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    status, payload = await self.handle_request(method, target, body)
+                except ValueError as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        """Load everything once, then serve until cancelled"""
+        self.load()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+            print(f"🚀 Serving on unix:{unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+            print(f"🚀 Serving on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RK73H lookup/fill service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="serve on this Unix socket path instead of TCP")
+    parser.add_argument('--catalog', default=resources.CATALOG_PATH)
+    parser.add_argument('--template', default=resources.TEMPLATE_PATH)
+    parser.add_argument('--max-concurrency', type=int, default=4,
+                        help="maximum number of fills running at once")
+    parser.add_argument('--batch-window', type=float, default=0,
+                        help="seconds to collect single lookups into one batch "
+                             "(0 = batch lookups arriving in the same event loop iteration)")
+    args = parser.parse_args()
+
+    service = FillService(args.catalog, args.template,
+                          max_concurrency=args.max_concurrency,
+                          batch_window=args.batch_window)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
@@ -0,0 +1,279 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = 'rk73h'
+
+_quiet = os.environ.get('RK73H_QUIET', '').lower() in ('1', 'true', 'yes')
+
+
+def set_quiet(quiet=True):
+    """Turn the per-item progress messages off (or back on)"""
+    global _quiet
+    _quiet = quiet
+
+
+def is_quiet():
+    return _quiet
+
+
+def progress(message):
+    """Print a per-item progress message unless quiet mode is on"""
+    if not _quiet:
+        print(message)
+
+
+class Metrics:
+    """
+    Process-wide stage timings and counters.
+
+        with METRICS.stage('parse_specifications'):
+            ...
+        METRICS.count('pages', len(pages))
+
+    Each stage records its call count, total and maximum wall time and,
+    while tracemalloc tracing is on (see enable_tracemalloc), the peak
+    traced memory reached inside it. Nested stages are timed
+    independently. The results can be exported as JSON or as Prometheus
+    text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded timings, counters and snapshots"""
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.snapshots = []
+
+    # Recording
+
+    def add_time(self, name, seconds, peak_bytes=None):
+        """Record one call of a stage that took `seconds`"""
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+            stage['calls'] += 1
+            stage['seconds'] += seconds
+            if seconds > stage['max_seconds']:
+                stage['max_seconds'] = seconds
+            if peak_bytes is not None and peak_bytes > stage.get('peak_bytes', 0):
+                stage['peak_bytes'] = peak_bytes
+
+    def count(self, name, value=1):
+        """Add `value` to a counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of stage `name`"""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # Peaks of enclosing stages are carried over the reset below
+            stack = self._peak_stack()
+            if stack:
+                stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+            stack.append(0)
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = None
+            if tracing and tracemalloc.is_tracing():
+                stack = self._peak_stack()
+                peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1] = max(stack[-1], peak)
+            self.add_time(name, seconds, peak)
+
+    def _peak_stack(self):
+        stack = getattr(self._local, 'peaks', None)
+        if stack is None:
+            stack = self._local.peaks = []
+        return stack
+
+    def snapshot(self, label, limit=10):
+        """Record the top `limit` allocation sites (needs tracemalloc tracing)"""
+        if not tracemalloc.is_tracing():
+            return None
+        stats = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+        entry = {
+            'label': label,
+            'traced_bytes': tracemalloc.get_traced_memory()[0],
+            'top': [{'location': str(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+                    for stat in stats]
+        }
+        with self._lock:
+            self.snapshots.append(entry)
+        return entry
+
+    # Transfer between processes
+
+    def state(self):
+        """Plain-data copy of the metrics, e.g. to return from a worker process"""
+        with self._lock:
+            return {
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'counters': dict(self.counters)
+            }
+
+    def merge(self, state):
+        """Fold metrics recorded elsewhere (see state) into these"""
+        with self._lock:
+            for name, other in state['stages'].items():
+                stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                stage['calls'] += other['calls']
+                stage['seconds'] += other['seconds']
+                stage['max_seconds'] = max(stage['max_seconds'], other['max_seconds'])
+                if 'peak_bytes' in other:
+                    stage['peak_bytes'] = max(stage.get('peak_bytes', 0), other['peak_bytes'])
+            for name, value in state['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    # Output
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'stages': {name: {key: round(value, 6) if isinstance(value, float) else value
+                                  for key, value in stage.items()}
+                           for name, stage in self.stages.items()},
+                'counters': dict(self.counters),
+                'snapshots': list(self.snapshots)
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """Metrics in the Prometheus text exposition format"""
+        data = self.to_dict()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(f"{prefix}_{name}{labels} {value}" for labels, value in samples)
+
+        def stage_samples(key):
+            return [(f'{{stage="{_label(name)}"}}', stage[key])
+                    for name, stage in data['stages'].items() if key in stage]
+
+        family('stage_seconds_total', 'counter', "Total wall time spent in each stage",
+               stage_samples('seconds'))
+        family('stage_calls_total', 'counter', "Number of times each stage ran",
+               stage_samples('calls'))
+        family('stage_max_seconds', 'gauge', "Longest single run of each stage",
+               stage_samples('max_seconds'))
+        family('stage_peak_bytes', 'gauge', "Peak traced memory inside each stage (tracemalloc)",
+               stage_samples('peak_bytes'))
+        for name, value in data['counters'].items():
+            family(f"{_metric_name(name)}_total", 'counter', f"Count of {name}", [('', value)])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, format=None):
+        """Write the metrics to a file: Prometheus text for .prom/.txt, JSON otherwise"""
+        if format is None:
+            format = 'prometheus' if os.path.splitext(path)[1] in ('.prom', '.txt') else 'json'
+        text = self.to_prometheus() if format == 'prometheus' else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def report(self):
+        """Print a short summary of stage timings and counters"""
+        data = self.to_dict()
+        if data['stages']:
+            print("\n⏱️  Stage timings:")
+            width = max(len(name) for name in data['stages'])
+            for name, stage in sorted(data['stages'].items(), key=lambda item: -item[1]['seconds']):
+                line = f"  {name:<{width}}  {stage['seconds']:9.3f}s  {stage['calls']:>7} calls"
+                if 'peak_bytes' in stage:
+                    line += f"  peak {stage['peak_bytes'] / 1e6:.1f} MB"
+                print(line)
+        if data['counters']:
+            print("🔢 Counters:")
+            for name, value in sorted(data['counters'].items()):
+                print(f"  {name}: {value}")
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_name(name):
+    return ''.join(c if c.isalnum() else '_' for c in name)
+
+
+METRICS = Metrics()
+
+stage = METRICS.stage
+count = METRICS.count
+
+
+def timed(name):
+    """Decorator timing every call of a function as stage `name`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable_tracemalloc(frames=1):
+    """Start tracemalloc so stages also record their peak memory"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def disable_tracemalloc():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+# Command line support shared by the entry points
+
+def add_arguments(parser):
+    """Add --quiet, --metrics and --trace-memory options to an argparse parser"""
+    parser.add_argument('--quiet', action='store_true',
+                        help="suppress per-page / per-part progress messages")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="write stage timings and counters to PATH "
+                             "(Prometheus text for .prom, JSON otherwise)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record peak memory per stage with tracemalloc (slower)")
+
+
+def configure(args):
+    """Apply the options added by add_arguments"""
+    if args.quiet:
+        set_quiet(True)
+    if args.trace_memory:
+        enable_tracemalloc()
+
+
+def finish(args):
+    """Report and write the metrics requested by add_arguments' options"""
+    if args.trace_memory:
+        METRICS.snapshot('end')
+    if args.metrics:
+        METRICS.write(args.metrics)
+        print(f"📈 Metrics written to {args.metrics}")
+    if args.metrics or args.trace_memory:
+        METRICS.report()
@@ -0,0 +1,33 @@
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in for a module that imports the real one on first attribute access"""
+
+    def __getattr__(self, attr):
+        # Only reached for names not copied in yet. import_module holds the
+        # import lock for the module, so threads racing on the first access
+        # all wait for one complete import instead of seeing it half run.
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """
+    Return a module that is only actually imported on first attribute access.
+
+    Heavy dependencies (pandas, numpy, pdfplumber, PyPDF2) are bound at module
+    level through this so that importing a module stays cheap and code paths
+    that never touch a dependency never pay for loading it. The first access
+    may come from any thread.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
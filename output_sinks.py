@@ -0,0 +1,223 @@
+import os
+
+from instrumentation import count
+from lazy_imports import lazy_import
+from stream_writer import StreamingExcelWriter
+
+pd = lazy_import('pandas')
+
+SINK_FORMATS = ('xlsx', 'csv', 'jsonl', 'parquet')
+
+_EXTENSIONS = {
+    '.xlsx': 'xlsx',
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet'
+}
+
+
+def _text_or_none(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+
+class OutputSink:
+    """
+    Destination for fill results that DataFrame chunks are appended to as
+    parts are processed. The first chunk fixes the column layout.
+
+    wants_separators tells producers whether to emit the human-oriented
+    '--- Next Part ---' rows; only spreadsheet sinks want them.
+    """
+
+    format = None
+    wants_separators = False
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, df):
+        """Append a chunk of rows"""
+        if self.columns is None:
+            self.columns = list(df.columns)
+        elif list(df.columns) != self.columns:
+            df = df.reindex(columns=self.columns)
+        if len(df):
+            self._write(df)
+            self.rows_written += len(df)
+            if self.format != 'xlsx':
+                # The XLSX sheet stream counts its own rows
+                count('rows_written', len(df))
+
+    def _write(self, df):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class XlsxSink(OutputSink):
+    """Excel workbook, streamed in constant memory onto a single sheet"""
+
+    format = 'xlsx'
+    wants_separators = True
+
+    def __init__(self, path, sheet_name='Sheet1'):
+        super().__init__(path)
+        self.sheet_name = sheet_name
+        self._writer = StreamingExcelWriter(path)
+        self._sheet = None
+
+    def write(self, df):
+        if self._sheet is None:
+            self._sheet = self._writer.add_sheet(self.sheet_name, list(df.columns))
+        super().write(df)
+
+    def _write(self, df):
+        self._sheet.append(df)
+
+    def close(self):
+        self._writer.close()
+
+
+class CsvSink(OutputSink):
+    """Comma-separated values with a single header row"""
+
+    format = 'csv'
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+
+    def _write(self, df):
+        df.to_csv(self._file, header=self.rows_written == 0, index=False)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink(OutputSink):
+    """JSON Lines: one JSON object per row"""
+
+    format = 'jsonl'
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write(self, df):
+        text = df.to_json(orient='records', lines=True, force_ascii=False)
+        self._file.write(text if text.endswith('\n') else text + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink(OutputSink):
+    """Apache Parquet, one row group per chunk (requires pyarrow)"""
+
+    format = 'parquet'
+
+    def __init__(self, path):
+        super().__init__(path)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._writer = None
+        self._schema = None
+
+    def _write(self, df):
+        # Object columns (e.g. the mixed-type 'value' column) are stored as text
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].map(_text_or_none).astype(object)
+        if self._writer is None:
+            schema = self._pa.Schema.from_pandas(df, preserve_index=False)
+            for i, field in enumerate(schema):
+                if self._pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(self._pa.string()))
+            self._schema = schema
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        table = self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class LazySink(OutputSink):
+    """
+    A sink that creates its file on the first non-empty write, so a run
+    that produces no rows leaves no file behind
+    """
+
+    def __init__(self, sink_class, path, **kwargs):
+        super().__init__(path)
+        self.format = sink_class.format
+        self.wants_separators = sink_class.wants_separators
+        self._sink_class = sink_class
+        self._kwargs = kwargs
+        self._sink = None
+
+    def write(self, df):
+        if self._sink is None:
+            if not len(df):
+                return
+            self._sink = self._sink_class(self.path, **self._kwargs)
+        self._sink.write(df)
+        self.columns = self._sink.columns
+        self.rows_written = self._sink.rows_written
+
+    def close(self):
+        if self._sink is not None:
+            self._sink.close()
+
+
+_SINKS = {
+    'xlsx': XlsxSink,
+    'csv': CsvSink,
+    'jsonl': JsonlSink,
+    'parquet': ParquetSink
+}
+
+
+def sink_format(path, format=None):
+    """Output format from an explicit name or the file extension (default xlsx)"""
+    if format:
+        if format not in _SINKS:
+            raise ValueError(f"Unknown output format '{format}' (choose from {', '.join(SINK_FORMATS)})")
+        return format
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'xlsx')
+
+
+def output_path(stem, format):
+    """File name for an output stem in the given format"""
+    return f"{stem}.{format}"
+
+
+def open_sink(path, format=None, lazy=False, **kwargs):
+    """
+    Open the sink for a path, choosing the format from `format` or the
+    extension. With lazy=True the file is only created once a row is
+    written (see LazySink).
+    """
+    sink_class = _SINKS[sink_format(path, format)]
+    if lazy:
+        return LazySink(sink_class, path, **kwargs)
+    return sink_class(path, **kwargs)
@@ -0,0 +1,374 @@
+import re
+import threading
+
+from instrumentation import count, stage
+from lazy_imports import lazy_import
+from resistance import decode_codes
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Numeric fields: query name -> catalog columns to read it from, in order of preference
+NUMERIC_FIELDS = {
+    'resistance': ('Resistance Code', 'Resistance'),
+    'power': ('Power Rating (W)',),
+    'voltage': ('Max Working Voltage (V)',),
+    'overload_voltage': ('Max Overload Voltage (V)',),
+    'tolerance': ('Tolerance (%)',),
+}
+
+# Categorical fields: query name -> catalog column
+CATEGORY_FIELDS = {
+    'size': 'EIA Code',
+    'size_code': 'Size Code',
+    'packaging': 'Packaging Code',
+    'termination': 'Termination Material Code',
+    'tolerance_code': 'Tolerance Code',
+    'series': 'Series',
+}
+
+# Predicates matching fewer rows than 1/SPARSE_FRACTION of the catalog are
+# answered by filtering their row positions; broader ones by ANDing bitmaps
+SPARSE_FRACTION = 32
+
+_SI_PREFIXES = {'': 1.0, 'm': 1e-3, 'k': 1e3, 'K': 1e3, 'M': 1e6, 'G': 1e9}
+_QUANTITY = r'([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([mkKMG]?)'
+_QUANTITY_RE = re.compile(r'^\s*[±]?' + _QUANTITY + r'\s*(?:Ω|ohms?|W|V|%)?\s*$')
+_CONDITION_RE = re.compile(r'(\w+)\s*(<=|>=|≤|≥|=|:|<|>)\s*(.*?)\s*(?=[;]|\s+\w+\s*(?:<=|>=|≤|≥|=|:|<|>)|$)')
+_RANGE_SEPARATOR = re.compile(r'\s*(?:\.\.|–|\bto\b)\s*')
+_LIST_SEPARATOR = re.compile(r'\s*(?:,|\||\bor\b)\s*')
+
+
+def parse_quantity(text):
+    """Number from a value such as '9.5k', '10.5kΩ', '0.25W' or '±1%'"""
+    match = _QUANTITY_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Not a number: '{text}'")
+    number, prefix = match.groups()
+    return float(number) * _SI_PREFIXES[prefix]
+
+
+def _numeric_column(series):
+    """Float values of a catalog column (numbers, or text such as '±1%' / '100kΩ')"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64)
+    # Parsed once per distinct value
+    inverse, unique = pd.factorize(series, use_na_sentinel=False)
+    parts = pd.Series(unique, dtype=object).astype(str).str.extract(_QUANTITY)
+    numbers = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=np.float64)
+    numbers = numbers * parts[1].fillna('').map(_SI_PREFIXES).to_numpy(dtype=np.float64)
+    return numbers[inverse]
+
+
+def _category_keys(field, values):
+    """Normalized category labels; EIA sizes read back as numbers regain their leading zero"""
+    keys = pd.Series(values, dtype=object).astype(str).str.strip().str.upper()
+    if field == 'size':
+        keys = keys.str.replace(r'\.0$', '', regex=True).str.zfill(4)
+    return keys
+
+
+def parse_query(text):
+    """
+    Criteria (see ParametricIndex.search) from a query string such as
+
+        resistance=9.5k..10.5k power>=0.25W size=0805,1206 tolerance<=1%
+
+    Conditions are field, operator (= : < <= > >= ≤ ≥) and value, separated
+    by spaces or ';'. Numeric fields take a range 'low..high' (or
+    'low–high', 'low to high'); categorical fields a list separated by
+    ',', '|' or 'or'.
+    """
+    criteria = {}
+    for field, op, value in _CONDITION_RE.findall(text):
+        field = field.lower()
+        if field in CATEGORY_FIELDS:
+            if op not in ('=', ':'):
+                raise ValueError(f"'{field}' only supports '=': {field}{op}{value}")
+            criteria[field] = [v for v in _LIST_SEPARATOR.split(value) if v]
+            continue
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Unknown field '{field}' (choose from {', '.join([*NUMERIC_FIELDS, *CATEGORY_FIELDS])})")
+
+        low, high = criteria.get(field, (None, None))
+        if op in ('=', ':'):
+            bounds = _RANGE_SEPARATOR.split(value)
+            if len(bounds) == 2:
+                low, high = parse_quantity(bounds[0]), parse_quantity(bounds[1])
+            else:
+                low = high = parse_quantity(value)
+        elif op in ('>=', '≥'):
+            low = parse_quantity(value)
+        elif op == '>':
+            low = np.nextafter(parse_quantity(value), np.inf)
+        elif op in ('<=', '≤'):
+            high = parse_quantity(value)
+        else:
+            high = np.nextafter(parse_quantity(value), -np.inf)
+        criteria[field] = (low, high)
+    if not criteria and text.strip():
+        raise ValueError(f"No conditions found in query '{text}'")
+    return criteria
+
+
+def _bound(value):
+    """A range bound as a float: numbers as is, text such as '9.5k' parsed, None open-ended"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return parse_quantity(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float, np.number)):
+        raise ValueError(f"Not a number: {value!r}")
+    return float(value)
+
+
+class _RangePredicate:
+    """low <= value <= high over a sorted numeric column"""
+
+    def __init__(self, column, low, high):
+        self.column = column
+        sorted_values = column.sorted_values
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        stop = column.valid_count if high is None else np.searchsorted(sorted_values, high, side='right')
+        self.rows = column.order[start:max(start, stop)]
+        self.low = -np.inf if low is None else low
+        self.high = np.inf if high is None else high
+        self.count = len(self.rows)
+
+    def positions(self):
+        return np.sort(self.rows)
+
+    def test(self, positions):
+        values = self.column.values[positions]
+        return (values >= self.low) & (values <= self.high)
+
+    def bitmap(self, size):
+        mask = np.zeros(size, dtype=bool)
+        mask[self.rows] = True
+        return np.packbits(mask)
+
+
+class _CategoryPredicate:
+    """value in a set of labels of a categorical column"""
+
+    def __init__(self, column, labels):
+        self.column = column
+        keys = _category_keys(column.field, labels).tolist()
+        self.codes = sorted({column.lookup[key] for key in keys if key in column.lookup})
+        self.count = int(sum(column.counts[code] for code in self.codes))
+
+    def positions(self):
+        parts = [self.column.positions(code) for code in self.codes]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+    def test(self, positions):
+        return np.isin(self.column.codes[positions], self.codes)
+
+    def bitmap(self, size):
+        if not self.codes:
+            return np.zeros((size + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce([self.column.bitmap(code) for code in self.codes])
+
+
+class _NumericColumn:
+    def __init__(self, values):
+        self.values = values
+        # NaN sorts last, so the valid values are a prefix of the sorted order
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order]
+        self.valid_count = int(np.count_nonzero(~np.isnan(values)))
+
+
+class _CategoryColumn:
+    def __init__(self, field, values):
+        self.field = field
+        # Normalized once per distinct value, then merged where labels coincide
+        inverse, unique = pd.factorize(values)
+        label_codes, labels = pd.factorize(_category_keys(field, unique))
+        codes = np.full(len(inverse), -1, dtype=np.intp)
+        codes[inverse >= 0] = label_codes[inverse[inverse >= 0]]
+        self.codes = codes
+        self.lookup = {label: code for code, label in enumerate(labels)}
+        # Row positions grouped by code (CSR layout), ascending within each group
+        self.order = np.argsort(codes, kind='stable')
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        self.starts = np.concatenate([[0], np.cumsum(self.counts)]) + np.count_nonzero(codes < 0)
+        self._bitmaps = {}
+
+    def positions(self, code):
+        return self.order[self.starts[code]:self.starts[code + 1]]
+
+    def bitmap(self, code):
+        bitmap = self._bitmaps.get(code)
+        if bitmap is None:
+            bitmap = self._bitmaps[code] = np.packbits(self.codes == code)
+        return bitmap
+
+
+class ParametricIndex:
+    """
+    Parametric search over a catalog DataFrame:
+
+        index.search(resistance=(9.5e3, 10.5e3), power=(0.25, None),
+                     size=['0805', '1206'], tolerance=(None, 1))
+
+    Numeric fields (NUMERIC_FIELDS) are indexed once as a sort order, so a
+    range is two binary searches (np.searchsorted). Categorical fields
+    (CATEGORY_FIELDS) are indexed as row positions grouped by value, with
+    a bitmap per value built on first use. A query starts from its most
+    selective predicate: if that matches few rows, the other predicates
+    are tested on just those rows; otherwise the predicates' bitmaps are
+    ANDed. Neither path scans the DataFrame.
+
+    Build it once per catalog (see get_parametric_index).
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.size = len(catalog)
+        self.numeric = {}
+        self.categories = {}
+        with stage('parametric_index'):
+            for field, columns in NUMERIC_FIELDS.items():
+                column = next((c for c in columns if c in catalog.columns), None)
+                if column is None:
+                    continue
+                if column == 'Resistance Code':
+                    values = decode_codes(catalog[column].to_numpy())
+                else:
+                    values = _numeric_column(catalog[column])
+                self.numeric[field] = _NumericColumn(values)
+            for field, column in CATEGORY_FIELDS.items():
+                if column in catalog.columns:
+                    self.categories[field] = _CategoryColumn(field, catalog[column].to_numpy())
+
+    @property
+    def fields(self):
+        return [*self.numeric, *self.categories]
+
+    def _predicate(self, field, condition):
+        if field in self.numeric:
+            if isinstance(condition, (tuple, list)):
+                if len(condition) != 2:
+                    raise ValueError(f"'{field}' takes (low, high), got {condition!r}")
+                low, high = (_bound(value) for value in condition)
+            else:
+                low = high = _bound(condition)
+            return _RangePredicate(self.numeric[field], low, high)
+        if field in self.categories:
+            labels = [condition] if isinstance(condition, (str, int, float)) else list(condition)
+            return _CategoryPredicate(self.categories[field], labels)
+        raise ValueError(f"Cannot search on '{field}' (indexed fields: {', '.join(self.fields)})")
+
+    def positions(self, criteria=None, **conditions):
+        """
+        Catalog row positions (ascending) matching every condition.
+
+        Numeric fields take (low, high), either bound None for open-ended,
+        or a single value for equality; categorical fields take a value or
+        a list of values. criteria can also be a query string (see
+        parse_query).
+        """
+        if isinstance(criteria, str):
+            criteria = parse_query(criteria)
+        criteria = {**(criteria or {}), **conditions}
+        with stage('parametric_search'):
+            predicates = sorted((self._predicate(field, condition) for field, condition in criteria.items()),
+                                key=lambda predicate: predicate.count)
+            if not predicates:
+                result = np.arange(self.size)
+            elif predicates[0].count * SPARSE_FRACTION <= self.size:
+                result = predicates[0].positions()
+                for predicate in predicates[1:]:
+                    if not len(result):
+                        break
+                    result = result[predicate.test(result)]
+            else:
+                bits = predicates[0].bitmap(self.size)
+                for predicate in predicates[1:]:
+                    bits = bits & predicate.bitmap(self.size)
+                result = np.flatnonzero(np.unpackbits(bits, count=self.size))
+        count('parametric_searches')
+        return result
+
+    def count(self, criteria=None, **conditions):
+        """Number of catalog rows matching the conditions"""
+        return len(self.positions(criteria, **conditions))
+
+    def search(self, criteria=None, limit=None, **conditions):
+        """Catalog rows (DataFrame) matching the conditions, in catalog order"""
+        positions = self.positions(criteria, **conditions)
+        if limit is not None:
+            positions = positions[:limit]
+        return self.catalog.iloc[positions]
+
+    def part_numbers(self, criteria=None, limit=None, column='Part Number', **conditions):
+        """Part numbers of the matching rows"""
+        return self.search(criteria, limit, **conditions)[column].tolist()
+
+
+_index_lock = threading.Lock()
+
+
+def get_parametric_index(catalog):
+    """
+    Return the shared ParametricIndex for a catalog DataFrame, building it
+    on first use. Like get_part_index, it is attached to the DataFrame
+    object, so catalogs modified in place need a fresh ParametricIndex.
+    """
+    index = catalog.__dict__.get('_parametric_index')
+    if index is not None:
+        return index
+    with _index_lock:
+        if '_parametric_index' not in catalog.__dict__:
+            catalog.__dict__['_parametric_index'] = ParametricIndex(catalog)
+        return catalog.__dict__['_parametric_index']
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    import instrumentation
+    import resources
+
+    parser = argparse.ArgumentParser(description="Parametric search over the RK73H catalog")
+    parser.add_argument('query', help="e.g. \"resistance=9.5k..10.5k power>=0.25 size=0805,1206 tolerance<=1%%\"")
+    parser.add_argument('--catalog', default=resources.CATALOG_PATH, help="catalog file to search")
+    parser.add_argument('--part-space', action='store_true',
+                        help="search every orderable RK73H part (see rk73h_part_space) instead of a catalog file")
+    parser.add_argument('--limit', type=int, default=20, help="rows to print (0 = all)")
+    parser.add_argument('--output', help="write all matching rows to this file (xlsx/csv/jsonl/parquet)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    if args.part_space:
+        from rk73h_part_space import RK73HPartSpace
+        space = RK73HPartSpace()
+        catalog = pd.concat(space.iter_frames(), ignore_index=True)
+    else:
+        catalog = resources.get_catalog(args.catalog)
+
+    index = get_parametric_index(catalog)
+    start = time.perf_counter()
+    try:
+        positions = index.positions(args.query)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    print(f"🔎 {len(positions)} of {len(catalog)} parts match ({elapsed * 1000:.2f} ms)")
+
+    shown = catalog.iloc[positions if not args.limit else positions[:args.limit]]
+    for _, row in shown.iterrows():
+        print(f"  {row['Part Number']}: {row.get('Resistance', '')}, {row.get('Tolerance (%)', '')}, "
+              f"{row.get('Power Rating (W)', '')}W, {row.get('EIA Code', '')}")
+    if args.limit and len(positions) > args.limit:
+        print(f"  ... and {len(positions) - args.limit} more")
+
+    if args.output:
+        from output_sinks import open_sink
+
+        with open_sink(args.output) as sink:
+            sink.write(catalog.iloc[positions])
+        print(f"💾 Wrote {sink.rows_written} rows to {args.output}")
+    instrumentation.finish(args)
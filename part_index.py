@@ -0,0 +1,132 @@
+import re
+import threading
+from bisect import bisect_left
+
+from instrumentation import count, stage
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_part_number(part_number):
+    """
+    Normalize a part number for lookup: whitespace removed and case folded,
+    so 'RK73H2B TD 1003 FT' and 'rk73h2btd1003ft' share a key
+    """
+    return _WHITESPACE.sub('', str(part_number)).casefold()
+
+
+class PartIndex:
+    """
+    Hashed part-number index over a catalog DataFrame.
+
+    Exact lookups go through a dict on the normalized part number; partial
+    part numbers are resolved through a sorted key list with a binary
+    search for the prefix range. Both return the first matching catalog
+    row, as a boolean-mask scan would. Build it once per catalog (see
+    get_part_index) and share it across lookups.
+    """
+
+    def __init__(self, catalog, column='Part Number'):
+        self.catalog = catalog
+        self.column = column
+
+        raw = catalog[column]
+        valid = raw.notna().to_numpy()
+        keys = (raw[valid].astype(str)
+                .str.replace(r'\s+', '', regex=True)
+                .str.casefold()
+                .tolist())
+        positions = np.flatnonzero(valid)
+
+        # Reversed so that the first occurrence of a duplicate key wins
+        self._exact = dict(zip(reversed(keys), reversed(positions.tolist())))
+        self._exact.pop('', None)
+
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._sorted_keys = [keys[i] for i in order]
+        self._sorted_positions = positions[order]
+
+    def __len__(self):
+        return len(self._exact)
+
+    def __contains__(self, part_number):
+        return normalize_part_number(part_number) in self._exact
+
+    def exact_position(self, part_number):
+        """Row position of an exact (normalized) match, or None"""
+        return self._exact.get(normalize_part_number(part_number))
+
+    def prefix_positions(self, prefix):
+        """Row positions of all part numbers starting with `prefix`, in catalog order"""
+        key = normalize_part_number(prefix)
+        if not key:
+            return np.empty(0, dtype=np.intp)
+        start = bisect_left(self._sorted_keys, key)
+        # Every key with this prefix sorts before key + the highest code point
+        stop = bisect_left(self._sorted_keys, key + '\U0010ffff', lo=start)
+        return np.sort(self._sorted_positions[start:stop])
+
+    def position(self, part_number, partial=True):
+        """
+        Row position for a part number: exact match first, then (if
+        partial) the first catalog row whose part number starts with it
+        """
+        pos = self.exact_position(part_number)
+        if pos is None and partial:
+            matches = self.prefix_positions(part_number)
+            if len(matches):
+                pos = int(matches[0])
+        return pos
+
+    def positions(self, part_numbers, partial=True):
+        """
+        Row positions for a sequence of part numbers in one vectorized pass.
+
+        Returns an integer array aligned with part_numbers, with -1 where a
+        part was not found. Only misses fall back to the prefix search.
+        """
+        with stage('lookup'):
+            keys = (pd.Series(list(part_numbers), dtype=object).astype(str)
+                    .str.replace(r'\s+', '', regex=True)
+                    .str.casefold())
+            found = keys.map(self._exact)
+            positions = found.fillna(-1).to_numpy(dtype=np.intp)
+            if partial:
+                for i in np.flatnonzero(positions < 0):
+                    matches = self.prefix_positions(keys.iat[i])
+                    if len(matches):
+                        positions[i] = matches[0]
+        count('lookups', len(positions))
+        return positions
+
+    def find(self, part_number, partial=True):
+        """Catalog row (Series) for a part number, or None if not found"""
+        pos = self.position(part_number, partial=partial)
+        if pos is None:
+            return None
+        return self.catalog.iloc[pos]
+
+
+_index_lock = threading.Lock()
+
+
+def get_part_index(catalog, column='Part Number'):
+    """
+    Return the shared PartIndex for a catalog DataFrame, building it on
+    first use. The index is attached to the DataFrame object, so it lives
+    exactly as long as the catalog; catalogs modified in place need a fresh
+    PartIndex.
+    """
+    indexes = catalog.__dict__.get('_part_indexes')
+    if indexes is not None and column in indexes:
+        return indexes[column]
+
+    with _index_lock:
+        indexes = catalog.__dict__.setdefault('_part_indexes', {})
+        if column not in indexes:
+            indexes[column] = PartIndex(catalog, column)
+        return indexes[column]
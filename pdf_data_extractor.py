@@ -1,13 +1,148 @@
-import pandas as pd
-import pdfplumber
-import PyPDF2
 import re
 from io import StringIO
+from extraction_cache import ExtractionCache
+import instrumentation
+from instrumentation import count, progress, stage, timed
+from lazy_imports import lazy_import
+from pdf_pages import DEFAULT_TEXT_BACKEND, TEXT_BACKENDS, iter_page_records
+from spec_scanner import SpecScanner
+from stream_writer import StreamingExcelWriter
+from table_prefilter import prefilter_counts, skip_summary
 
-def extract_pdf_data(pdf_path):
-    """Extract all data from RK73H.pdf and organize it"""
+pd = lazy_import('pandas')
+
+# Common specification patterns
+SPEC_PATTERNS = [
+    r'Resistance[:\s]+([^\\n]+)',
+    r'Tolerance[:\s]+([^\\n]+)',
+    r'Power Rating[:\s]+([^\\n]+)',
+    r'Working Voltage[:\s]+([^\\n]+)',
+    r'Temperature Range[:\s]+([^\\n]+)',
+    r'Temperature Coefficient[:\s]+([^\\n]+)',
+    r'Package[:\s]+([^\\n]+)',
+    r'Series[:\s]+([^\\n]+)'
+]
+
+# Pattern for RK73H part numbers
+PART_PATTERNS = [
+    r'RK73H[A-Z0-9\s]+[A-Z]{2,3}\s*[0-9]{3,4}\s*[A-Z]{1,2}'
+]
+
+# Electrical parameter sections
+ELECTRICAL_PATTERNS = [
+    r'Resistance Range[:\s]+([^\\n]+)',
+    r'Power Dissipation[:\s]+([^\\n]+)',
+    r'Voltage Rating[:\s]+([^\\n]+)',
+    r'Temperature Coefficient[:\s]+([^\\n]+)',
+    r'Tolerance[:\s]+([^\\n]+)'
+]
+
+# Dimension patterns
+DIM_PATTERNS = [
+    r'Length[:\s]+([0-9.]+\s*mm)',
+    r'Width[:\s]+([0-9.]+\s*mm)',
+    r'Height[:\s]+([0-9.]+\s*mm)',
+    r'Thickness[:\s]+([0-9.]+\s*mm)',
+    r'([0-9.]+)\s*×\s*([0-9.]+)\s*×?\s*([0-9.]*)\s*mm'
+]
+
+def iter_pages(pdf_path, cache=None, text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+    """Yield one record per page: {'page', 'text', 'tables'}"""
+    for record in iter_page_records(pdf_path, cache=cache, text_backend=text_backend,
+                                    strict_tables=strict_tables):
+        if record['text']:
+            record['text'] = f"\n--- PAGE {record['page']} ---\n" + record['text']
+        yield record
+
+def _page_texts(source):
+    """Yield text chunks from a string or an iterable of page records"""
+    if isinstance(source, str):
+        yield source
+        return
+    for record in source:
+        if record['text']:
+            yield record['text']
+
+# Every analyzer pattern, matched together in one pass over each page.
+# Patterns shared between analyzers (e.g. Tolerance) are matched once.
+PAGE_SCANNER = SpecScanner()
+for _group, _patterns, _flags in (('specifications', SPEC_PATTERNS, re.IGNORECASE),
+                                  ('part_numbers', PART_PATTERNS, 0),
+                                  ('electrical', ELECTRICAL_PATTERNS, re.IGNORECASE),
+                                  ('dimensions', DIM_PATTERNS, re.IGNORECASE)):
+    for _pattern in _patterns:
+        PAGE_SCANNER.register((_group, _pattern), _pattern, flags=_flags)
+
+def _group_matches(matches, group):
+    """Per-pattern matches of one analyzer group from PAGE_SCANNER results"""
+    return {pattern: found for (name_group, pattern), found in matches.items()
+            if name_group == group}
+
+def _scan(source):
+    matches = PAGE_SCANNER.new_results()
+    for chunk in _page_texts(source):
+        PAGE_SCANNER.scan_into(chunk, matches)
+    return matches
+
+def _parameter_rows(matches, value_key):
+    rows = []
+    for pattern, found in matches.items():
+        param_name = pattern.split('[')[0]
+        for match in found:
+            rows.append({
+                'Parameter': param_name,
+                value_key: match.strip()
+            })
+    return rows
+
+def _specification_rows(matches):
+    return _parameter_rows(matches, 'Value')
+
+def _part_number_rows(matches):
+    part_numbers = []
+    for found in matches.values():
+        for match in found:
+            part_numbers.append({
+                'Part Number': match.strip(),
+                'Series': 'RK73H',
+                'Type': 'Thick Film Resistor'
+            })
+    return part_numbers
+
+def _electrical_rows(matches):
+    return _parameter_rows(matches, 'Specification')
+
+def _dimension_rows(matches):
+    dimensions = []
+    for found in matches.values():
+        for match in found:
+            if isinstance(match, tuple):
+                dimensions.append({
+                    'Dimension Type': 'L×W×H',
+                    'Value': ' × '.join([str(m) for m in match if m])
+                })
+            else:
+                dimensions.append({
+                    'Dimension Type': 'Physical',
+                    'Value': match.strip()
+                })
+    return dimensions
+
+@timed('extract_pdf_data')
+def extract_pdf_data(pdf_path, cache=None, text_path=None, text_backend=DEFAULT_TEXT_BACKEND,
+                     strict_tables=False):
+    """
+    Extract all data from RK73H.pdf and organize it
+
+    Pages are streamed through every analyzer in a single pass, so only one
+    page of text and tables is in memory at a time. If text_path is given the
+    page text is written there as it streams and no full text is returned;
+    otherwise the full text is returned alongside the data.
+    text_backend: 'pdfplumber' or 'pypdf2' for page text (see pdf_pages)
+    strict_tables: extract tables on every page, bypassing the table prefilter
+    """
     
-    print("📖 Reading PDF file...")
+    print(f"📖 Reading PDF file (text: {text_backend})...")
     
     # Initialize data storage
     extracted_data = {
@@ -18,161 +153,89 @@ def extract_pdf_data(pdf_path):
         'ordering_information': []
     }
     
+    matches = PAGE_SCANNER.new_results()
+    table_data = {}
+    text_chunks = []
+    text_file = None
+    prefilter_before = prefilter_counts()
+    
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            all_text = ""
-            tables = []
-            
-            print(f"📄 PDF has {len(pdf.pages)} pages")
-            
-            # Extract text and tables from each page
-            for page_num, page in enumerate(pdf.pages, 1):
-                print(f"📝 Processing page {page_num}...")
-                
-                # Extract text
-                page_text = page.extract_text()
-                if page_text:
-                    all_text += f"\n--- PAGE {page_num} ---\n" + page_text
-                
-                # Extract tables
-                page_tables = page.extract_tables()
-                if page_tables:
-                    for table_num, table in enumerate(page_tables):
-                        print(f"  📊 Found table {table_num + 1} on page {page_num}")
-                        tables.append({
-                            'page': page_num,
-                            'table_num': table_num + 1,
-                            'data': table
-                        })
-            
-            # Process extracted data
-            print("\n🔍 Analyzing extracted content...")
-            
-            # Extract specifications
-            specs = extract_specifications(all_text)
-            extracted_data['specifications'] = specs
-            
-            # Extract part numbers and their details
-            part_info = extract_part_numbers(all_text)
-            extracted_data['part_numbers'] = part_info
-            
-            # Process tables for structured data
-            table_data = process_tables(tables)
-            extracted_data.update(table_data)
-            
-            # Extract electrical characteristics
-            electrical = extract_electrical_characteristics(all_text)
-            extracted_data['electrical_characteristics'] = electrical
-            
-            # Extract physical dimensions
-            dimensions = extract_dimensions(all_text)
-            extracted_data['physical_dimensions'] = dimensions
+        if text_path:
+            text_file = open(text_path, 'w', encoding='utf-8')
+        
+        page_count = 0
+        table_count = 0
+        for record in iter_pages(pdf_path, cache=cache, text_backend=text_backend,
+                                 strict_tables=strict_tables):
+            page_num = record['page']
+            page_count += 1
+            progress(f"📝 Processing page {page_num}...")
             
-            return extracted_data, all_text
+            # Analyze this page's text
+            page_text = record['text']
+            if page_text:
+                with stage('scan'):
+                    PAGE_SCANNER.scan_into(page_text, matches)
+                if text_file:
+                    text_file.write(page_text)
+                else:
+                    text_chunks.append(page_text)
             
+            # Process this page's tables
+            page_tables = []
+            for table_num, table in enumerate(record['tables'] or []):
+                progress(f"  📊 Found table {table_num + 1} on page {page_num}")
+                page_tables.append({
+                    'page': page_num,
+                    'table_num': table_num + 1,
+                    'data': table
+                })
+            table_count += len(page_tables)
+            table_data.update(process_tables(page_tables))
+        
+        count('pages', page_count)
+        count('tables', table_count)
+        count('matches', sum(len(found) for found in matches.values()))
+        print(f"📄 PDF has {page_count} pages")
+        summary = skip_summary(prefilter_before)
+        if summary:
+            print(summary)
+        
+        # Assemble analysis results
+        print("\n🔍 Analyzing extracted content...")
+        
+        extracted_data['specifications'] = _specification_rows(_group_matches(matches, 'specifications'))
+        extracted_data['part_numbers'] = _part_number_rows(_group_matches(matches, 'part_numbers'))
+        extracted_data.update(table_data)
+        extracted_data['electrical_characteristics'] = _electrical_rows(_group_matches(matches, 'electrical'))
+        extracted_data['physical_dimensions'] = _dimension_rows(_group_matches(matches, 'dimensions'))
+        
+        all_text = None if text_file else ''.join(text_chunks)
+        return extracted_data, all_text
+        
     except Exception as e:
         print(f"❌ Error reading PDF: {e}")
         return None, None
+    
+    finally:
+        if text_file:
+            text_file.close()
 
 def extract_specifications(text):
-    """Extract general specifications from text"""
-    specs = []
-    
-    # Common specification patterns
-    spec_patterns = [
-        r'Resistance[:\s]+([^\\n]+)',
-        r'Tolerance[:\s]+([^\\n]+)',
-        r'Power Rating[:\s]+([^\\n]+)',
-        r'Working Voltage[:\s]+([^\\n]+)',
-        r'Temperature Range[:\s]+([^\\n]+)',
-        r'Temperature Coefficient[:\s]+([^\\n]+)',
-        r'Package[:\s]+([^\\n]+)',
-        r'Series[:\s]+([^\\n]+)'
-    ]
-    
-    for pattern in spec_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            param_name = pattern.split('[')[0]
-            for match in matches:
-                specs.append({
-                    'Parameter': param_name,
-                    'Value': match.strip()
-                })
-    
-    return specs
+    """Extract general specifications from text or an iterable of page records"""
+    return _specification_rows(_group_matches(_scan(text), 'specifications'))
 
 def extract_part_numbers(text):
-    """Extract part numbers and their details"""
-    part_numbers = []
-    
-    # Pattern for RK73H part numbers
-    part_pattern = r'RK73H[A-Z0-9\s]+[A-Z]{2,3}\s*[0-9]{3,4}\s*[A-Z]{1,2}'
-    
-    matches = re.findall(part_pattern, text)
-    for match in matches:
-        part_numbers.append({
-            'Part Number': match.strip(),
-            'Series': 'RK73H',
-            'Type': 'Thick Film Resistor'
-        })
-    
-    return part_numbers
+    """Extract part numbers and their details from text or page records"""
+    return _part_number_rows(_group_matches(_scan(text), 'part_numbers'))
 
 def extract_electrical_characteristics(text):
-    """Extract electrical characteristics"""
-    characteristics = []
-    
-    # Look for electrical parameter sections
-    electrical_patterns = [
-        r'Resistance Range[:\s]+([^\\n]+)',
-        r'Power Dissipation[:\s]+([^\\n]+)',
-        r'Voltage Rating[:\s]+([^\\n]+)',
-        r'Temperature Coefficient[:\s]+([^\\n]+)',
-        r'Tolerance[:\s]+([^\\n]+)'
-    ]
-    
-    for pattern in electrical_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            param_name = pattern.split('[')[0]
-            for match in matches:
-                characteristics.append({
-                    'Parameter': param_name,
-                    'Specification': match.strip()
-                })
-    
-    return characteristics
+    """Extract electrical characteristics from text or page records"""
+    return _electrical_rows(_group_matches(_scan(text), 'electrical'))
 
 def extract_dimensions(text):
-    """Extract physical dimensions"""
-    dimensions = []
-    
-    # Look for dimension patterns
-    dim_patterns = [
-        r'Length[:\s]+([0-9.]+\s*mm)',
-        r'Width[:\s]+([0-9.]+\s*mm)',
-        r'Height[:\s]+([0-9.]+\s*mm)',
-        r'Thickness[:\s]+([0-9.]+\s*mm)',
-        r'([0-9.]+)\s*×\s*([0-9.]+)\s*×?\s*([0-9.]*)\s*mm'
-    ]
-    
-    for pattern in dim_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            for match in matches:
-                if isinstance(match, tuple):
-                    dimensions.append({
-                        'Dimension Type': 'L×W×H',
-                        'Value': ' × '.join([str(m) for m in match if m])
-                    })
-                else:
-                    dimensions.append({
-                        'Dimension Type': 'Physical',
-                        'Value': match.strip()
-                    })
-    
-    return dimensions
+    """Extract physical dimensions from text or page records"""
+    return _dimension_rows(_group_matches(_scan(text), 'dimensions'))
 
 def process_tables(tables):
     """Process extracted tables into structured data"""
@@ -194,35 +257,37 @@ def process_tables(tables):
     
     return processed_tables
 
+@timed('create_excel_datasheet')
 def create_excel_datasheet(extracted_data, output_file='RK73H_Complete_Datasheet.xlsx'):
     """Create comprehensive Excel datasheet"""
     
     print(f"\n📊 Creating Excel datasheet: {output_file}")
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    # Sheets are streamed to disk one at a time (constant memory)
+    with StreamingExcelWriter(output_file) as writer:
         
         # Sheet 1: Specifications
         if extracted_data['specifications']:
             specs_df = pd.DataFrame(extracted_data['specifications'])
-            specs_df.to_excel(writer, sheet_name='Specifications', index=False)
+            writer.write_frame('Specifications', specs_df)
             print("  ✓ Specifications sheet created")
         
         # Sheet 2: Part Numbers
         if extracted_data['part_numbers']:
             parts_df = pd.DataFrame(extracted_data['part_numbers'])
-            parts_df.to_excel(writer, sheet_name='Part_Numbers', index=False)
+            writer.write_frame('Part_Numbers', parts_df)
             print("  ✓ Part Numbers sheet created")
         
         # Sheet 3: Electrical Characteristics
         if extracted_data['electrical_characteristics']:
             electrical_df = pd.DataFrame(extracted_data['electrical_characteristics'])
-            electrical_df.to_excel(writer, sheet_name='Electrical_Characteristics', index=False)
+            writer.write_frame('Electrical_Characteristics', electrical_df)
             print("  ✓ Electrical Characteristics sheet created")
         
         # Sheet 4: Physical Dimensions
         if extracted_data['physical_dimensions']:
             dimensions_df = pd.DataFrame(extracted_data['physical_dimensions'])
-            dimensions_df.to_excel(writer, sheet_name='Physical_Dimensions', index=False)
+            writer.write_frame('Physical_Dimensions', dimensions_df)
             print("  ✓ Physical Dimensions sheet created")
         
         # Additional sheets for tables
@@ -232,7 +297,7 @@ def create_excel_datasheet(extracted_data, output_file='RK73H_Complete_Datasheet
                 try:
                     table_df = pd.DataFrame(data)
                     sheet_name = f'Table_{sheet_count}'
-                    table_df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    writer.write_frame(sheet_name, table_df)
                     print(f"  ✓ {sheet_name} created")
                     sheet_count += 1
                 except:
@@ -243,22 +308,33 @@ def create_excel_datasheet(extracted_data, output_file='RK73H_Complete_Datasheet
 
 # Main execution
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extract RK73H.pdf into an Excel datasheet")
+    parser.add_argument('--text-backend', choices=TEXT_BACKENDS, default=DEFAULT_TEXT_BACKEND,
+                        help="page text extractor: pdfplumber (layout-aware) or pypdf2 (faster)")
+    parser.add_argument('--strict-tables', action='store_true',
+                        help="extract tables on every page (disable the table prefilter)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+    
     print("📋 RK73H PDF Data Extraction")
     print("=" * 50)
     
     pdf_file = 'RK73H.pdf'
     
     # Extract data from PDF
-    extracted_data, full_text = extract_pdf_data(pdf_file)
+    # (the full text is streamed to RK73H_extracted_text.txt for reference)
+    extracted_data, _ = extract_pdf_data(pdf_file, cache=ExtractionCache(),
+                                         text_path='RK73H_extracted_text.txt',
+                                         text_backend=args.text_backend,
+                                         strict_tables=args.strict_tables)
     
     if extracted_data:
         # Create Excel datasheet
         excel_file = create_excel_datasheet(extracted_data)
         
-        # Save full text for reference
-        with open('RK73H_extracted_text.txt', 'w', encoding='utf-8') as f:
-            f.write(full_text)
-        
         print("\n📁 Files created:")
         print(f"  📊 Excel datasheet: {excel_file}")
         print(f"  📝 Full text: RK73H_extracted_text.txt")
@@ -272,3 +348,5 @@ if __name__ == "__main__":
                 print(f"  {key}: {len(data)} entries")
     else:
         print("❌ Failed to extract data from PDF")
+    
+    instrumentation.finish(args)
@@ -1,12 +1,30 @@
-import pandas as pd
-import pdfplumber
 import re
 from datetime import datetime
-import numpy as np
+from compact_records import PageText, TableRecord, compact_frame, intern_rows
+from extraction_cache import ExtractionCache
+import instrumentation
+from instrumentation import count, stage, timed
+from lazy_imports import lazy_import
+from pdf_pages import DEFAULT_TEXT_BACKEND, TEXT_BACKENDS, default_workers, extract_page_records
+from spec_scanner import SpecScanner
+from table_prefilter import prefilter_counts, skip_summary
+from stream_writer import StreamingExcelWriter
 
-def extract_pdf_data(pdf_path):
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+def extract_pdf_data(pdf_path, workers=1, cache=None, text_backend=DEFAULT_TEXT_BACKEND,
+                     strict_tables=False):
     """
     Extract all information from RK73H.pdf and structure it into organized data
+
+    workers: number of processes to shard pages across (None = all cores,
+    1 = serial extraction in this process)
+    cache: optional ExtractionCache; unchanged pages are loaded from it
+    text_backend: 'pdfplumber' (layout-aware) or 'pypdf2' (faster plain
+    text); tables are always extracted with pdfplumber
+    strict_tables: run table extraction on every page instead of only on
+    pages the table prefilter considers likely to hold a table
     """
     print("🔍 Extracting data from PDF...")
     
@@ -18,61 +36,71 @@ def extract_pdf_data(pdf_path):
         'technical_data': []
     }
     
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        print(f"📄 Processing {total_pages} pages...")
+    if workers is None:
+        workers = default_workers()
+    mode = f"{workers} workers" if workers > 1 else "serial"
+    
+    prefilter_before = prefilter_counts()
+    with stage('extract_pdf_data'):
+        page_records = extract_page_records(pdf_path, workers=workers, cache=cache,
+                                            text_backend=text_backend, strict_tables=strict_tables)
+    total_pages = len(page_records)
+    count('pages', total_pages)
+    print(f"📄 Processed {total_pages} pages ({mode}, text: {text_backend})")
+    summary = skip_summary(prefilter_before)
+    if summary:
+        print(f"   {summary}")
+    
+    # Merge page results in page order
+    for record in page_records:
+        page_num = record['page']
+        
+        text = record['text']
+        if text:
+            extracted_data['text_content'].append(PageText(page_num, text))
         
-        for page_num, page in enumerate(pdf.pages, 1):
-            print(f"   Processing page {page_num}/{total_pages}")
-            
-            # Extract text
-            text = page.extract_text()
-            if text:
-                extracted_data['text_content'].append({
-                    'page': page_num,
-                    'text': text
-                })
-            
-            # Extract tables
-            tables = page.extract_tables()
-            for table_idx, table in enumerate(tables):
-                if table:
-                    extracted_data['tables'].append({
-                        'page': page_num,
-                        'table_index': table_idx,
-                        'data': table
-                    })
+        for table_idx, table in enumerate(record['tables']):
+            if table:
+                extracted_data['tables'].append(TableRecord(page_num, table_idx, intern_rows(table)))
+    count('tables', len(extracted_data['tables']))
     
     return extracted_data
 
+# Common specification patterns
+SPEC_PATTERNS = {
+    'resistance_range': r'Resistance.*?(\d+.*?Ω.*?\d+.*?Ω)',
+    'tolerance': r'Tolerance.*?([±]?\d+\.?\d*%)',
+    'power_rating': r'Power.*?(\d+\.?\d*\s*W)',
+    'voltage': r'Voltage.*?(\d+\.?\d*\s*V)',
+    'temperature_range': r'Temperature.*?(-?\d+°C.*?\+?\d+°C)',
+    'tcr': r'T\.C\.R.*?([±]?\d+.*?ppm)',
+    'package_sizes': r'Package.*?(EIA.*?\d+)',
+    'series': r'Series.*?(RK\d+[A-Z]*)'
+}
+
+SPEC_SCANNER = SpecScanner()
+for _spec_name, _pattern in SPEC_PATTERNS.items():
+    SPEC_SCANNER.register(_spec_name, _pattern)
+
+@timed('parse_specifications')
 def parse_specifications(extracted_data):
     """
     Parse specifications from the extracted text
     """
     print("📋 Parsing specifications...")
     
-    specifications = {}
     all_text = ' '.join([item['text'] for item in extracted_data['text_content']])
     
-    # Common specification patterns
-    spec_patterns = {
-        'resistance_range': r'Resistance.*?(\d+.*?Ω.*?\d+.*?Ω)',
-        'tolerance': r'Tolerance.*?([±]?\d+\.?\d*%)',
-        'power_rating': r'Power.*?(\d+\.?\d*\s*W)',
-        'voltage': r'Voltage.*?(\d+\.?\d*\s*V)',
-        'temperature_range': r'Temperature.*?(-?\d+°C.*?\+?\d+°C)',
-        'tcr': r'T\.C\.R.*?([±]?\d+.*?ppm)',
-        'package_sizes': r'Package.*?(EIA.*?\d+)',
-        'series': r'Series.*?(RK\d+[A-Z]*)'
-    }
-    
-    for spec_name, pattern in spec_patterns.items():
-        matches = re.findall(pattern, all_text, re.IGNORECASE)
+    # All spec patterns are matched in a single pass over the text
+    specifications = {}
+    for spec_name, matches in SPEC_SCANNER.scan(all_text).items():
         if matches:
             specifications[spec_name] = matches
+            count('spec_matches', len(matches))
     
     return specifications
 
+@timed('extract_part_numbers')
 def extract_part_numbers(extracted_data):
     """
     Extract all part numbers from the PDF
@@ -90,9 +118,45 @@ def extract_part_numbers(extracted_data):
         clean_part = re.sub(r'\s+', ' ', match.strip())
         if clean_part not in part_numbers:
             part_numbers.append(clean_part)
+    count('part_number_matches', len(matches))
     
     return part_numbers
 
+def process_table(table_info):
+    """
+    Structure one extracted table ({'page', 'table_index', 'data'}) as a
+    DataFrame, or return None if it has no data rows
+    """
+    table_data = table_info['data']
+    page = table_info['page']
+    
+    if not table_data or len(table_data) < 2:
+        return None
+    
+    # Try to identify table structure
+    headers = table_data[0]
+    rows = table_data[1:]
+    
+    # Clean headers
+    clean_headers = []
+    for header in headers:
+        if header:
+            clean_headers.append(str(header).strip())
+        else:
+            clean_headers.append(f"Column_{len(clean_headers)}")
+    
+    # Create DataFrame, with numeric and categorical columns stored compactly
+    df = compact_frame(rows, clean_headers)
+    
+    return {
+        'page': page,
+        'table_index': table_info['table_index'],
+        'dataframe': df,
+        'headers': clean_headers,
+        'row_count': len(df)
+    }
+
+@timed('process_tables')
 def process_tables(extracted_data):
     """
     Process and structure table data
@@ -102,43 +166,15 @@ def process_tables(extracted_data):
     processed_tables = []
     
     for table_info in extracted_data['tables']:
-        table_data = table_info['data']
-        page = table_info['page']
-        
-        if not table_data or len(table_data) < 2:
-            continue
-        
-        # Try to identify table structure
-        headers = table_data[0]
-        rows = table_data[1:]
-        
-        # Clean headers
-        clean_headers = []
-        for header in headers:
-            if header:
-                clean_headers.append(str(header).strip())
-            else:
-                clean_headers.append(f"Column_{len(clean_headers)}")
-        
-        # Create DataFrame
         try:
-            df = pd.DataFrame(rows, columns=clean_headers)
-            
-            # Remove empty rows
-            df = df.dropna(how='all')
-            
-            # Store processed table
-            processed_tables.append({
-                'page': page,
-                'table_index': table_info['table_index'],
-                'dataframe': df,
-                'headers': clean_headers,
-                'row_count': len(df)
-            })
-            
+            processed = process_table(table_info)
         except Exception as e:
-            print(f"   ⚠️ Error processing table on page {page}: {e}")
+            print(f"   ⚠️ Error processing table on page {table_info['page']}: {e}")
             continue
+        if processed is not None:
+            # Store processed table
+            processed_tables.append(processed)
+    count('tables_processed', len(processed_tables))
     
     return processed_tables
 
@@ -163,69 +199,90 @@ def create_comprehensive_datasheet(extracted_data, specifications, part_numbers,
     
     return datasheet
 
+def table_sheet_name(table_info, i):
+    """Sheet name for the i-th (0-based) processed table"""
+    sheet_name = f"Table_Page_{table_info['page']}_{i+1}"
+    if len(sheet_name) > 31:  # Excel sheet name limit
+        sheet_name = f"Table_{i+1}"
+    return sheet_name
+
+@timed('save_to_excel')
 def save_to_excel(datasheet, filename="RK73H_Complete_Datasheet.xlsx"):
     """
     Save all extracted data to Excel with multiple sheets
     """
     print(f"💾 Saving to Excel: {filename}")
     
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+    # Rows are streamed to disk sheet by sheet (constant memory)
+    with StreamingExcelWriter(filename) as writer:
         
         # Sheet 1: Document Summary
         doc_info = pd.DataFrame.from_dict(datasheet['Document_Info'], orient='index', columns=['Value'])
-        doc_info.to_excel(writer, sheet_name='Document_Info')
+        writer.write_frame('Document_Info', doc_info, index=True)
         
         # Sheet 2: General Specifications
-        if datasheet['General_Specifications']:
-            spec_data = []
-            for spec_type, values in datasheet['General_Specifications'].items():
-                for value in values:
-                    spec_data.append({'Specification_Type': spec_type, 'Value': value})
-            
-            if spec_data:
-                spec_df = pd.DataFrame(spec_data)
-                spec_df.to_excel(writer, sheet_name='General_Specifications', index=False)
+        if any(datasheet['General_Specifications'].values()):
+            spec_rows = ((spec_type, value)
+                         for spec_type, values in datasheet['General_Specifications'].items()
+                         for value in values)
+            writer.write_sheet('General_Specifications', ['Specification_Type', 'Value'], [spec_rows])
         
         # Sheet 3: Part Numbers
         if datasheet['Part_Numbers']:
-            part_df = pd.DataFrame(datasheet['Part_Numbers'], columns=['Part_Number'])
-            part_df.to_excel(writer, sheet_name='Part_Numbers', index=False)
+            part_rows = ((part,) for part in datasheet['Part_Numbers'])
+            writer.write_sheet('Part_Numbers', ['Part_Number'], [part_rows])
         
         # Sheet 4+: Individual Tables
         for i, table_info in enumerate(datasheet['Detailed_Tables']):
-            sheet_name = f"Table_Page_{table_info['page']}_{i+1}"
-            if len(sheet_name) > 31:  # Excel sheet name limit
-                sheet_name = f"Table_{i+1}"
-            
             try:
-                table_info['dataframe'].to_excel(writer, sheet_name=sheet_name, index=False)
+                writer.write_frame(table_sheet_name(table_info, i), table_info['dataframe'])
             except Exception as e:
                 print(f"   ⚠️ Error saving table {i+1}: {e}")
         
         # Sheet: All Text Content
-        text_data = []
-        for item in datasheet['_raw_text']:
-            text_data.append({
-                'Page': item['page'],
-                'Content': item['text'][:32000]  # Excel cell limit
-            })
-        
-        if text_data:
-            text_df = pd.DataFrame(text_data)
-            text_df.to_excel(writer, sheet_name='Raw_Text_Content', index=False)
+        if datasheet['_raw_text']:
+            text_rows = ((item['page'], item['text'][:32000])  # Excel cell limit
+                         for item in datasheet['_raw_text'])
+            writer.write_sheet('Raw_Text_Content', ['Page', 'Content'], [text_rows])
 
-def main():
+def main(workers=1, use_cache=True, text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False,
+         manifest=None, pipelined=False):
     """
     Main function to extract all data from RK73H.pdf
+
+    manifest: path of a corpus manifest (see corpus_manifest); when given,
+    the datasheet is only re-extracted and rewritten if the PDF changed
+    pipelined: overlap extraction, parsing and writing (see pdf_pipeline)
     """
     pdf_path = 'RK73H.pdf'
     
+    if manifest:
+        from corpus_manifest import datasheet_filename, refresh
+        summary = refresh([pdf_path], manifest_path=manifest, workers=workers,
+                          text_backend=text_backend, strict_tables=strict_tables)
+        return None if summary.get('failed') else datasheet_filename(pdf_path)
+    
     print("🚀 Starting PDF Data Extraction")
     print("="*50)
     
     try:
+        cache = ExtractionCache() if use_cache else None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"RK73H_Complete_Datasheet_{timestamp}.xlsx"
+        
+        if pipelined:
+            import asyncio
+            from pdf_pipeline import run_pipeline
+            print(f"💾 Streaming to Excel: {output_filename}")
+            extracted_data, specifications, part_numbers, table_count = asyncio.run(run_pipeline(
+                pdf_path, output_filename, workers=workers or default_workers(), cache=cache,
+                text_backend=text_backend, strict_tables=strict_tables))
+            _print_summary(output_filename, extracted_data, specifications, part_numbers, table_count)
+            return output_filename
+        
         # Step 1: Extract raw data
-        extracted_data = extract_pdf_data(pdf_path)
+        extracted_data = extract_pdf_data(pdf_path, workers=workers, cache=cache,
+                                          text_backend=text_backend, strict_tables=strict_tables)
         
         # Step 2: Parse specifications
         specifications = parse_specifications(extracted_data)
@@ -235,42 +292,21 @@ def main():
         
         # Step 4: Process tables
         processed_tables = process_tables(extracted_data)
+        # The DataFrames now hold the table contents; drop the raw rows
+        extracted_data['tables'].clear()
         
         # Step 5: Create comprehensive datasheet
         datasheet = create_comprehensive_datasheet(
             extracted_data, specifications, part_numbers, processed_tables
         )
         
-        # Add raw text for reference
+        # Add raw text for reference (the same page records, not a copy)
         datasheet['_raw_text'] = extracted_data['text_content']
         
         # Step 6: Save to Excel
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"RK73H_Complete_Datasheet_{timestamp}.xlsx"
         save_to_excel(datasheet, output_filename)
         
-        # Print summary
-        print("\n" + "="*50)
-        print("✅ EXTRACTION COMPLETE!")
-        print("="*50)
-        print(f"📁 Output file: {output_filename}")
-        print(f"📄 Pages processed: {len(extracted_data['text_content'])}")
-        print(f"📊 Tables found: {len(processed_tables)}")
-        print(f"🔢 Part numbers found: {len(part_numbers)}")
-        print(f"📋 Specification types: {len(specifications)}")
-        
-        if part_numbers:
-            print(f"\n🔍 Sample part numbers found:")
-            for i, part in enumerate(part_numbers[:5]):
-                print(f"  {i+1}. {part}")
-            if len(part_numbers) > 5:
-                print(f"  ... and {len(part_numbers) - 5} more")
-        
-        if specifications:
-            print(f"\n📋 Specifications extracted:")
-            for spec_type, values in specifications.items():
-                print(f"  • {spec_type}: {len(values)} entries")
-        
+        _print_summary(output_filename, extracted_data, specifications, part_numbers, len(processed_tables))
         return output_filename
         
     except FileNotFoundError:
@@ -282,5 +318,51 @@ def main():
         print(f"❌ Error during extraction: {e}")
         return None
 
+def _print_summary(output_filename, extracted_data, specifications, part_numbers, table_count):
+    """Print the end-of-run summary"""
+    print("\n" + "="*50)
+    print("✅ EXTRACTION COMPLETE!")
+    print("="*50)
+    print(f"📁 Output file: {output_filename}")
+    print(f"📄 Pages processed: {len(extracted_data['text_content'])}")
+    print(f"📊 Tables found: {table_count}")
+    print(f"🔢 Part numbers found: {len(part_numbers)}")
+    print(f"📋 Specification types: {len(specifications)}")
+    
+    if part_numbers:
+        print(f"\n🔍 Sample part numbers found:")
+        for i, part in enumerate(part_numbers[:5]):
+            print(f"  {i+1}. {part}")
+        if len(part_numbers) > 5:
+            print(f"  ... and {len(part_numbers) - 5} more")
+    
+    if specifications:
+        print(f"\n📋 Specifications extracted:")
+        for spec_type, values in specifications.items():
+            print(f"  • {spec_type}: {len(values)} entries")
+
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extract all data from RK73H.pdf")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes for page extraction (0 = all cores, 1 = serial)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="re-extract every page instead of using the extraction cache")
+    parser.add_argument('--text-backend', choices=TEXT_BACKENDS, default=DEFAULT_TEXT_BACKEND,
+                        help="page text extractor: pdfplumber (layout-aware) or pypdf2 (faster); "
+                             "tables always use pdfplumber")
+    parser.add_argument('--strict-tables', action='store_true',
+                        help="extract tables on every page (disable the table prefilter)")
+    parser.add_argument('--manifest', metavar='PATH',
+                        help="incremental mode: only re-extract when the PDF changed since the "
+                             "run recorded in this manifest (writes an untimestamped datasheet)")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="overlap page extraction, table parsing and workbook writing")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+    
+    main(workers=args.workers or None, use_cache=not args.no_cache, text_backend=args.text_backend,
+         strict_tables=args.strict_tables, manifest=args.manifest, pipelined=args.pipelined)
+    instrumentation.finish(args)
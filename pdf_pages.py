@@ -0,0 +1,280 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from extraction_cache import file_content_hash
+from instrumentation import METRICS, stage
+from lazy_imports import lazy_import
+from table_prefilter import TABLE_PREFILTER_VERSION, may_have_tables
+
+pdfplumber = lazy_import('pdfplumber')
+PyPDF2 = lazy_import('PyPDF2')
+
+# Bump whenever the content of a page record changes, so cached pages
+# produced by an older extractor are not reused
+EXTRACTOR_VERSION = '1'
+
+# Text backends: pdfplumber's layout engine, or PyPDF2's much faster plain
+# text extraction. Tables always come from pdfplumber.
+TEXT_BACKENDS = ('pdfplumber', 'pypdf2')
+DEFAULT_TEXT_BACKEND = 'pdfplumber'
+
+
+def extractor_version(text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+    """Version string used to key cached page records"""
+    version = f"{EXTRACTOR_VERSION}/pdfplumber-{pdfplumber.__version__}"
+    if text_backend == 'pypdf2':
+        version += f"+pypdf2-{PyPDF2.__version__}"
+    if not strict_tables:
+        # Pages skipped by the table prefilter are cached without tables
+        version += f"+tablefilter-{TABLE_PREFILTER_VERSION}"
+    return version
+
+
+def _map_file(pdf_path):
+    with open(pdf_path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def open_shared_pdf(pdf_path):
+    """
+    Open a PDF through a read-only memory map of the file.
+
+    Every worker maps the same file, so the operating system shares the
+    underlying pages instead of each process reading its own copy.
+    Closing the returned PDF also unmaps the file.
+    """
+    pdf = pdfplumber.open(_map_file(pdf_path))
+    # pdfplumber leaves streams it was handed open; the map is ours to close
+    pdf.stream_is_external = False
+    return pdf
+
+
+def count_pages(pdf_path, text_backend=DEFAULT_TEXT_BACKEND):
+    """Return the number of pages in the PDF"""
+    with PageSource(pdf_path, text_backend) as source:
+        return source.page_count
+
+
+class PageSource:
+    """
+    An open PDF that page records are extracted from with the chosen text
+    backend. Each library opens the document only when first needed.
+    """
+
+    def __init__(self, pdf_path, text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+        if text_backend not in TEXT_BACKENDS:
+            raise ValueError(f"Unknown text backend '{text_backend}' (choose from {', '.join(TEXT_BACKENDS)})")
+        self.pdf_path = pdf_path
+        self.text_backend = text_backend
+        self.strict_tables = strict_tables
+        self._plumber = None
+        self._reader = None
+        self._reader_map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def plumber(self):
+        if self._plumber is None:
+            self._plumber = open_shared_pdf(self.pdf_path)
+        return self._plumber
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            # PyPDF2 never closes the stream it reads from, so close() unmaps it
+            self._reader_map = _map_file(self.pdf_path)
+            self._reader = PyPDF2.PdfReader(self._reader_map)
+        return self._reader
+
+    @property
+    def page_count(self):
+        if self.text_backend == 'pypdf2':
+            return len(self.reader.pages)
+        return len(self.plumber.pages)
+
+    def extract(self, page_num):
+        """
+        Page record {'page', 'text', 'tables'} for a 1-based page number.
+
+        Unless strict_tables is set, table extraction is skipped on pages
+        the table prefilter rules out; with the pypdf2 backend such pages
+        never go through pdfplumber at all.
+        """
+        plumber_page = None
+        text_page = None
+        if self.text_backend == 'pypdf2':
+            text_page = self.reader.pages[page_num - 1]
+            with stage('extract.text.pypdf2'):
+                text = text_page.extract_text()
+        else:
+            plumber_page = self.plumber.pages[page_num - 1]
+            with stage('extract.text.pdfplumber'):
+                text = plumber_page.extract_text()
+
+        tables = []
+        if self.strict_tables or may_have_tables(plumber_page, text_page):
+            if plumber_page is None:
+                plumber_page = self.plumber.pages[page_num - 1]
+            with stage('extract.tables'):
+                tables = plumber_page.extract_tables()
+
+        if plumber_page is not None:
+            # Drop pdfplumber's cached layout objects so memory stays per-page
+            plumber_page.flush_cache()
+        return {
+            'page': page_num,
+            'text': text,
+            'tables': tables
+        }
+
+    def close(self):
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        self._reader = None
+        if self._reader_map is not None:
+            self._reader_map.close()
+            self._reader_map = None
+
+
+def extract_pages(pdf_path, page_numbers, text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+    """
+    Worker entry point: extract the given 1-based page numbers from the PDF
+    """
+    with PageSource(pdf_path, text_backend, strict_tables) as source:
+        return [source.extract(i) for i in page_numbers]
+
+
+def _extract_shard(pdf_path, page_numbers, text_backend, strict_tables):
+    """Worker entry point returning the records and the worker's metrics"""
+    METRICS.reset()
+    records = extract_pages(pdf_path, page_numbers, text_backend, strict_tables)
+    return records, METRICS.state()
+
+
+def shard_pages(page_numbers, workers):
+    """
+    Split a list of page numbers into at most `workers` contiguous shards
+    """
+    shard_count = max(1, min(workers, len(page_numbers)))
+    size, extra = divmod(len(page_numbers), shard_count)
+    shards = []
+    start = 0
+    for i in range(shard_count):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            shards.append(page_numbers[start:stop])
+        start = stop
+    return shards
+
+
+def default_workers():
+    """Number of worker processes to use when none is given"""
+    return os.cpu_count() or 1
+
+
+def _extract_uncached(pdf_path, page_numbers, workers, text_backend=DEFAULT_TEXT_BACKEND,
+                      strict_tables=False):
+    """Extract the given pages, in parallel when more than one worker is allowed"""
+    shards = shard_pages(page_numbers, workers)
+    if len(shards) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+                futures = [pool.submit(_extract_shard, pdf_path, shard, text_backend, strict_tables) for shard in shards]
+                records = []
+                for future in futures:
+                    shard_records, shard_metrics = future.result()
+                    records.extend(shard_records)
+                    METRICS.merge(shard_metrics)
+            return records
+        except (OSError, RuntimeError) as e:
+            print(f"   ⚠️ Parallel extraction failed ({e}), falling back to serial")
+
+    return extract_pages(pdf_path, page_numbers, text_backend, strict_tables)
+
+
+def iter_page_records(pdf_path, cache=None, text_backend=DEFAULT_TEXT_BACKEND, strict_tables=False):
+    """
+    Yield page records one at a time in page order.
+
+    Only the current page is held in memory, so callers that consume the
+    records incrementally use memory proportional to page size rather than
+    document size. Cached pages are served from the ExtractionCache if given.
+    """
+    with PageSource(pdf_path, text_backend, strict_tables) as source:
+        if cache is None:
+            for page_num in range(1, source.page_count + 1):
+                yield source.extract(page_num)
+            return
+
+        content_hash = file_content_hash(pdf_path)
+        version = extractor_version(text_backend, strict_tables)
+        total_pages = cache.get_page_count(content_hash, version)
+        if total_pages is None:
+            total_pages = source.page_count
+            cache.put_page_count(content_hash, version, total_pages)
+
+        extracted = 0
+        for page_num in range(1, total_pages + 1):
+            record = cache.get_page(content_hash, page_num, version)
+            if record is None:
+                record = source.extract(page_num)
+                cache.put_page(content_hash, page_num, version, record)
+                extracted += 1
+            yield record
+
+    if extracted:
+        cache.evict()
+
+
+def extract_page_records(pdf_path, workers=1, cache=None, text_backend=DEFAULT_TEXT_BACKEND,
+                         strict_tables=False):
+    """
+    Extract every page of the PDF as a list of page records in page order.
+
+    With workers > 1 the pages are sharded across a process pool; any
+    failure to start or run the pool falls back to serial extraction.
+    When an ExtractionCache is given, unchanged pages are loaded from it and
+    only the missing pages are extracted. text_backend selects where page
+    text comes from (see TEXT_BACKENDS); strict_tables turns the table
+    prefilter off. Both are part of the cache key.
+    """
+    if workers is None:
+        workers = default_workers()
+
+    if cache is None:
+        page_numbers = list(range(1, count_pages(pdf_path, text_backend) + 1))
+        return _extract_uncached(pdf_path, page_numbers, workers, text_backend, strict_tables)
+
+    content_hash = file_content_hash(pdf_path)
+    version = extractor_version(text_backend, strict_tables)
+
+    total_pages = cache.get_page_count(content_hash, version)
+    if total_pages is None:
+        total_pages = count_pages(pdf_path, text_backend)
+        cache.put_page_count(content_hash, version, total_pages)
+
+    records = {}
+    missing = []
+    for page_num in range(1, total_pages + 1):
+        record = cache.get_page(content_hash, page_num, version)
+        if record is None:
+            missing.append(page_num)
+        else:
+            records[page_num] = record
+
+    if missing:
+        for record in _extract_uncached(pdf_path, missing, workers, text_backend, strict_tables):
+            cache.put_page(content_hash, record['page'], version, record)
+            records[record['page']] = record
+        cache.evict()
+
+    METRICS.count('pages_cached', total_pages - len(missing))
+    print(f"   🗄️ Extraction cache: {total_pages - len(missing)} pages cached, {len(missing)} extracted")
+    return [records[page_num] for page_num in range(1, total_pages + 1)]
@@ -0,0 +1,231 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from compact_records import PageText, TableRecord, intern_rows
+from extraction_cache import file_content_hash
+from instrumentation import METRICS, count, stage
+from pdf_extractor import extract_part_numbers, parse_specifications, process_table, table_sheet_name
+from pdf_pages import DEFAULT_TEXT_BACKEND, PageSource, count_pages, extractor_version
+from stream_writer import StreamingExcelWriter
+from table_prefilter import prefilter_counts, skip_summary
+
+# Pages and tables allowed to wait between stages; bounds memory on large documents
+DEFAULT_QUEUE_SIZE = 8
+
+_worker_source = None
+
+
+def _init_worker(pdf_path, text_backend, strict_tables):
+    global _worker_source
+    _worker_source = PageSource(pdf_path, text_backend, strict_tables)
+
+
+def _extract_in_worker(page_num):
+    """Worker entry point returning a page record and the worker's metrics for it"""
+    METRICS.reset()
+    record = _worker_source.extract(page_num)
+    return record, METRICS.state()
+
+
+def _process_page_tables(record):
+    """Processed tables of one page record, in table order"""
+    processed = []
+    for table_idx, table in enumerate(record['tables']):
+        if not table:
+            continue
+        try:
+            table_info = process_table(TableRecord(record['page'], table_idx, intern_rows(table)))
+        except Exception as e:
+            print(f"   ⚠️ Error processing table on page {record['page']}: {e}")
+            continue
+        if table_info is not None:
+            processed.append(table_info)
+    return processed
+
+
+class _Pipeline:
+    """
+    State shared by the stages of one run_pipeline call. Each stage runs
+    as its own task and hands work on through a bounded queue; blocking
+    work goes to an executor so the event loop only moves data between
+    stages.
+    """
+
+    def __init__(self, pdf_path, workers, cache, text_backend, strict_tables, queue_size):
+        self.pdf_path = pdf_path
+        self.workers = workers
+        self.cache = cache
+        self.text_backend = text_backend
+        self.strict_tables = strict_tables
+        self.version = extractor_version(text_backend, strict_tables)
+        self.content_hash = None
+        self.page_queue = asyncio.Queue(queue_size)
+        self.table_queue = asyncio.Queue(queue_size)
+        self.text_content = []
+        self.specifications = {}
+        self.part_numbers = []
+        self.table_count = 0
+        self.extracted = 0
+
+        # Extraction runs in worker processes even with workers=1, so it
+        # does not compete with parsing and writing for this process's GIL
+        self.extract_executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(pdf_path, text_backend, strict_tables))
+        self.io_executor = ThreadPoolExecutor(max_workers=2)
+        self.cpu_executor = ThreadPoolExecutor(max_workers=1)
+        # xlsxwriter is not thread safe: every workbook call goes through this one thread
+        self.write_executor = ThreadPoolExecutor(max_workers=1)
+
+    def close(self):
+        for executor in (self.extract_executor, self.io_executor, self.cpu_executor, self.write_executor):
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, executor, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def page_count(self):
+        if self.cache is None:
+            return await self.run(self.io_executor, count_pages, self.pdf_path, self.text_backend)
+        self.content_hash = await self.run(self.io_executor, file_content_hash, self.pdf_path)
+        total = await self.run(self.io_executor, self.cache.get_page_count, self.content_hash, self.version)
+        if total is None:
+            total = await self.run(self.io_executor, count_pages, self.pdf_path, self.text_backend)
+            await self.run(self.io_executor, self.cache.put_page_count, self.content_hash, self.version, total)
+        return total
+
+    async def fetch(self, page_num):
+        """Page record from the cache, or extracted (and cached)"""
+        if self.cache is not None:
+            record = await self.run(self.io_executor, self.cache.get_page, self.content_hash, page_num, self.version)
+            if record is not None:
+                count('pages_cached')
+                return record
+
+        record, worker_metrics = await self.run(self.extract_executor, _extract_in_worker, page_num)
+        METRICS.merge(worker_metrics)
+        self.extracted += 1
+
+        if self.cache is not None:
+            await self.run(self.io_executor, self.cache.put_page, self.content_hash, page_num, self.version, record)
+        return record
+
+    async def read_pages(self, total_pages):
+        """Stage 1: fetch pages, several in flight, and queue them in page order"""
+        depth = max(2, self.workers * 2)
+        in_flight = deque()
+        for page_num in range(1, total_pages + 1):
+            in_flight.append(asyncio.ensure_future(self.fetch(page_num)))
+            if len(in_flight) >= depth:
+                await self.page_queue.put(await in_flight.popleft())
+        while in_flight:
+            await self.page_queue.put(await in_flight.popleft())
+        await self.page_queue.put(None)
+
+    async def parse_pages(self):
+        """
+        Stage 2: keep page text and turn each page's tables into
+        DataFrames. The spec and part number patterns can match across
+        page boundaries, so those run once over the joined text after the
+        last page, while the writer drains the remaining tables.
+        """
+        while (record := await self.page_queue.get()) is not None:
+            count('pages')
+            if record['text']:
+                self.text_content.append(PageText(record['page'], record['text']))
+            for table_info in await self.run(self.cpu_executor, _process_page_tables, record):
+                await self.table_queue.put(table_info)
+        await self.table_queue.put(None)
+
+        extracted_data = {'text_content': self.text_content}
+        self.specifications = await self.run(self.cpu_executor, parse_specifications, extracted_data)
+        self.part_numbers = await self.run(self.cpu_executor, extract_part_numbers, extracted_data)
+
+    async def write_tables(self, writer):
+        """Stage 3: stream each table into its own sheet as soon as it is ready"""
+        while (table_info := await self.table_queue.get()) is not None:
+            sheet_name = table_sheet_name(table_info, self.table_count)
+            self.table_count += 1
+            try:
+                await self.run(self.write_executor, writer.write_frame, sheet_name, table_info['dataframe'])
+            except Exception as e:
+                print(f"   ⚠️ Error saving table {self.table_count}: {e}")
+
+
+async def run_pipeline(pdf_path, output_filename, workers=1, cache=None, text_backend=DEFAULT_TEXT_BACKEND,
+                       strict_tables=False, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Extract a PDF into the same workbook as pdf_extractor.main, with
+    reading, table parsing and sheet writing overlapped instead of run one
+    after another.
+
+    Pages are extracted (in worker processes when workers > 1) and flow
+    through bounded queues to table parsing and on to the writer, which
+    streams every table sheet as soon as its page is parsed. The
+    Document_Info, General_Specifications and Part_Numbers sheets are
+    created first, to keep the sheet order, and filled in at the end
+    (so they are present even when empty).
+
+    Returns (extracted_data, specifications, part_numbers, table_count).
+    """
+    pipeline = _Pipeline(pdf_path, workers, cache, text_backend, strict_tables, queue_size)
+    prefilter_before = prefilter_counts()
+    try:
+        writer = await pipeline.run(pipeline.write_executor, StreamingExcelWriter, output_filename)
+        try:
+            def add_summary_sheets():
+                return (writer.add_sheet('Document_Info', ['', 'Value']),
+                        writer.add_sheet('General_Specifications', ['Specification_Type', 'Value']),
+                        writer.add_sheet('Part_Numbers', ['Part_Number']))
+            info_sheet, spec_sheet, part_sheet = await pipeline.run(pipeline.write_executor, add_summary_sheets)
+
+            with stage('pipeline'):
+                total_pages = await pipeline.page_count()
+                tasks = [asyncio.ensure_future(pipeline.read_pages(total_pages)),
+                         asyncio.ensure_future(pipeline.parse_pages()),
+                         asyncio.ensure_future(pipeline.write_tables(writer))]
+                try:
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    raise
+            extracted_data = {'text_content': pipeline.text_content}
+            specifications = pipeline.specifications
+            part_numbers = pipeline.part_numbers
+
+            print(f"📄 Processed {total_pages} pages (pipelined, {pipeline.workers} workers, "
+                  f"text: {text_backend})")
+            summary = skip_summary(prefilter_before)
+            if summary:
+                print(f"   {summary}")
+            count('tables', pipeline.table_count)
+            count('tables_processed', pipeline.table_count)
+
+            def write_summary_sheets():
+                info_sheet.append([
+                    ('Title', 'RK73H Series Resistor Data'),
+                    ('Extraction_Date', datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                    ('Total_Pages', len(pipeline.text_content)),
+                    ('Total_Tables', pipeline.table_count)
+                ])
+                spec_sheet.append((spec_type, value)
+                                  for spec_type, values in specifications.items() for value in values)
+                part_sheet.append((part,) for part in part_numbers)
+                if pipeline.text_content:
+                    text_rows = ((item['page'], item['text'][:32000])  # Excel cell limit
+                                 for item in pipeline.text_content)
+                    writer.write_sheet('Raw_Text_Content', ['Page', 'Content'], [text_rows])
+            await pipeline.run(pipeline.write_executor, write_summary_sheets)
+        finally:
+            await pipeline.run(pipeline.write_executor, writer.close)
+    finally:
+        pipeline.close()
+
+    if cache is not None:
+        print(f"   🗄️ Extraction cache: {total_pages - pipeline.extracted} pages cached, "
+              f"{pipeline.extracted} extracted")
+        if pipeline.extracted:
+            cache.evict()
+    return extracted_data, specifications, part_numbers, pipeline.table_count
@@ -0,0 +1,181 @@
+from functools import lru_cache
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# E-series values as three significant digits (100 = 1.00 × 10^n).
+# E24 keeps its historical values, which do not follow the formula the
+# E48/E96/E192 series are computed from.
+E24 = (100, 110, 120, 130, 150, 160, 180, 200, 220, 240, 270, 300,
+       330, 360, 390, 430, 470, 510, 560, 620, 680, 750, 820, 910)
+
+
+def _geometric_series(steps):
+    values = [int(round(100 * 10 ** (i / steps))) for i in range(steps)]
+    # IEC 60063 lists 920 where the formula gives 919
+    return tuple(920 if v == 919 else v for v in values)
+
+
+E192 = _geometric_series(192)
+E96 = E192[::2]
+E48 = E192[::4]
+E12 = E24[::2]
+E6 = E24[::4]
+E3 = E24[::8]
+
+E_SERIES = {'E3': E3, 'E6': E6, 'E12': E12, 'E24': E24, 'E48': E48, 'E96': E96, 'E192': E192}
+
+# Decades generated by series_values when no bounds are given: mantissas
+# times 10^-3 to 10^6, so 0.1Ω up to 988MΩ (E192; 976MΩ for E96, 910MΩ for E24)
+MIN_EXPONENT = -3
+MAX_EXPONENT = 6
+
+_SCALES = ((1e6, 'M'), (1e3, 'k'))
+
+
+def series_values(series='E96', low=None, high=None):
+    """
+    Resistances (ohms, ascending) of an E-series between low and high
+    inclusive, e.g. series_values('E24', 10, 1e6)
+    """
+    mantissas = np.array(E_SERIES[series], dtype=np.float64)
+    exponents = np.arange(MIN_EXPONENT, MAX_EXPONENT + 1)
+    values = np.round((mantissas[None, :] * 10.0 ** exponents[:, None]).ravel(), 6)
+    if low is not None:
+        values = values[values >= low]
+    if high is not None:
+        values = values[values <= high]
+    return values
+
+
+def _factorize(values):
+    """
+    Inverse index and distinct values (hashed, not sorted), so the work
+    below is done once per distinct value however long the input is
+    """
+    inverse, unique = pd.factorize(np.asarray(values, dtype=object).ravel(), use_na_sentinel=False)
+    return inverse, np.asarray(unique)
+
+
+def decode_codes(codes):
+    """
+    Resistances in ohms for an array of resistance codes, NaN where a code
+    is not valid:
+
+        3 digits: two significant digits and a multiplier   103  -> 10kΩ
+        4 digits: three significant digits and a multiplier  4731 -> 4.73kΩ
+        R-notation: R marks the decimal point                4R70 -> 4.7Ω, R100 -> 0.1Ω
+
+    Either way, a digit code is its significant digits (code // 10) times
+    ten to the power of its last digit (code % 10).
+    """
+    inverse, unique = _factorize(codes)
+    unique = np.char.upper(np.char.strip(unique.astype(str)))
+    lengths = np.char.str_len(unique)
+    ohms = np.full(len(unique), np.nan)
+
+    digits = np.char.isdigit(unique) & ((lengths == 3) | (lengths == 4))
+    if digits.any():
+        numbers = unique[digits].astype(np.int64)
+        ohms[digits] = (numbers // 10) * 10.0 ** (numbers % 10)
+
+    with_r = (np.char.count(unique, 'R') == 1) & (lengths >= 2) & (lengths <= 5)
+    if with_r.any():
+        decimal = np.char.replace(unique[with_r], 'R', '.')
+        valid = np.char.isdigit(np.char.replace(decimal, '.', ''))
+        values = np.full(len(decimal), np.nan)
+        values[valid] = decimal[valid].astype(np.float64)
+        ohms[with_r] = values
+
+    return ohms[inverse]
+
+
+def encode_values(ohms, digits=4):
+    """
+    Resistance codes for an array of resistances: `digits` 3 or 4 gives
+    EIA codes with two or three significant digits, using R-notation below
+    the smallest value a multiplier can express (e.g. 4R70, R100).
+    Values are rounded to the significant digits; invalid values give ''.
+    """
+    if digits not in (3, 4):
+        raise ValueError("digits must be 3 or 4")
+    significant = digits - 1
+    ohms = np.asarray(ohms, dtype=np.float64)
+    codes = np.full(ohms.shape, '', dtype=object)
+    valid = np.isfinite(ohms) & (ohms > 0)
+    if not valid.any():
+        return codes
+
+    values = ohms[valid]
+    exponents = np.floor(np.log10(values)).astype(np.int64) - (significant - 1)
+    mantissas = np.round(values / 10.0 ** exponents).astype(np.int64)
+    # Rounding up to the next power of ten (e.g. 9996 -> 1000 × 10)
+    overflow = mantissas >= 10 ** significant
+    mantissas[overflow] //= 10
+    exponents[overflow] += 1
+
+    out = np.full(len(values), '', dtype=object)
+    multiplied = (exponents >= 0) & (exponents <= 9)
+    out[multiplied] = np.char.add(mantissas[multiplied].astype(str), exponents[multiplied].astype(str))
+    # Below one multiplier step the decimal point moves into the code
+    for exponent in range(-significant, 0):
+        selected = exponents == exponent
+        if not selected.any():
+            continue
+        scale = 10 ** -exponent
+        whole = mantissas[selected] // scale
+        fraction = np.char.zfill((mantissas[selected] % scale).astype(str), -exponent)
+        whole_text = np.where(whole > 0, whole.astype(str), '')
+        out[selected] = np.char.add(np.char.add(whole_text, 'R'), fraction)
+    codes[valid] = out
+    return codes
+
+
+def format_ohms(ohms):
+    """Resistances as the catalog writes them (100kΩ, 4.73kΩ, 4.7Ω); '' for NaN"""
+    inverse, unique = _factorize(np.asarray(ohms, dtype=np.float64))
+    unique = unique.astype(np.float64)
+    text = np.full(len(unique), '', dtype=object)
+    finite = np.isfinite(unique)
+    scale = np.ones(len(unique))
+    suffix = np.full(len(unique), '', dtype=object)
+    for factor, name in reversed(_SCALES):
+        selected = unique >= factor
+        scale[selected] = factor
+        suffix[selected] = name
+    numbers = np.round(unique[finite] / scale[finite], 6)
+    text[finite] = np.char.add(np.char.mod('%g', numbers), suffix[finite].astype(str)).astype(object) + 'Ω'
+    return text[inverse]
+
+
+@lru_cache(maxsize=4096)
+def describe_code(code):
+    """Catalog-style value for one resistance code ('4731' -> '4.73kΩ'), or None if invalid"""
+    ohms = decode_codes([code])[0]
+    return None if np.isnan(ohms) else format_ohms([ohms])[0]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Decode and encode resistance codes")
+    parser.add_argument('codes', nargs='*', help="resistance codes to decode (e.g. 4731, 103, 4R70)")
+    parser.add_argument('--encode', type=float, nargs='+', metavar='OHMS', help="resistances to encode")
+    parser.add_argument('--digits', type=int, choices=(3, 4), default=4, help="code length for --encode")
+    parser.add_argument('--series', choices=list(E_SERIES), help="list an E-series")
+    parser.add_argument('--low', type=float, help="lowest value listed by --series")
+    parser.add_argument('--high', type=float, help="highest value listed by --series")
+    args = parser.parse_args()
+
+    if args.codes:
+        for code, ohms, text in zip(args.codes, decode_codes(args.codes), format_ohms(decode_codes(args.codes))):
+            print(f"  {code}: {text} ({ohms:g} Ω)" if text else f"  ❌ {code}: not a resistance code")
+    if args.encode:
+        for ohms, code in zip(args.encode, encode_values(args.encode, args.digits)):
+            print(f"  {ohms:g} Ω: {code or '❌ cannot be encoded'}")
+    if args.series:
+        values = series_values(args.series, args.low, args.high)
+        print(f"📋 {args.series}: {len(values)} values")
+        print('  ' + ', '.join(format_ohms(values)))
@@ -0,0 +1,64 @@
+import threading
+
+CATALOG_PATH = 'RK73H_Full_Data.xlsx'
+TEMPLATE_PATH = 'test1.xlsx'
+
+_instances = {}
+_lock = threading.RLock()
+
+
+def _singleton(key, factory):
+    """Create the process-wide instance for `key` on first use"""
+    try:
+        return _instances[key]
+    except KeyError:
+        pass
+    with _lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+
+def get_catalog(path=CATALOG_PATH):
+    """Process-wide catalog DataFrame, loaded on first use"""
+    def load():
+        from catalog_store import load_catalog
+        return load_catalog(path)
+    return _singleton(('catalog', path), load)
+
+
+def get_template(path=TEMPLATE_PATH):
+    """
+    Process-wide template DataFrame, loaded on first use. It is shared, so
+    callers must copy it before modifying it.
+    """
+    def load():
+        import pandas as pd
+        return pd.read_excel(path)
+    return _singleton(('template', path), load)
+
+
+def get_part_index(path=CATALOG_PATH):
+    """Shared PartIndex over the process-wide catalog"""
+    from part_index import get_part_index as index_for
+    return index_for(get_catalog(path))
+
+
+def get_parametric_index(path=CATALOG_PATH):
+    """Shared ParametricIndex over the process-wide catalog"""
+    from parametric_search import get_parametric_index as index_for
+    return index_for(get_catalog(path))
+
+
+def get_data_provider():
+    """Process-wide RK73HDataProvider, created on first use"""
+    def create():
+        from rk73h_datasheet_generator import RK73HDataProvider
+        return RK73HDataProvider()
+    return _singleton('data_provider', create)
+
+
+def reset():
+    """Drop all loaded instances so the next access reloads them"""
+    with _lock:
+        _instances.clear()
@@ -1,7 +1,30 @@
-import pandas as pd
-import numpy as np
 from datetime import datetime
-import re
+from compiled_template import CompiledTemplate
+import instrumentation
+from instrumentation import progress, timed
+from lazy_imports import lazy_import
+from output_sinks import open_sink, output_path, sink_format
+import resistance
+import resources
+import rk73h_decoder
+from rk73h_decoder import TOLERANCE_CODES
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+# Size codes -> EIA codes and power ratings
+SIZE_MAPPING = {
+    '1E': ('0402', '0.063W'),
+    '1J': ('0603', '0.1W'),
+    '2A': ('0805', '0.125W'),
+    '2B': ('1206', '0.25W'),
+    '2F': ('1210', '0.5W'),
+    '3A': ('1812', '0.75W'),
+    '3B': ('2010', '0.75W'),
+    '3C': ('2512', '1W')
+}
+
+DEFAULT_VOLTAGE_RATING = '50V'  # When the size is unknown
 
 class RK73HDataProvider:
     """
@@ -11,8 +34,16 @@ class RK73HDataProvider:
     def __init__(self):
         self.extracted_data = self.load_extracted_data()
         self.template = self.load_template()
+        self.compiled_template = CompiledTemplate(self.template, self.template_constants())
+        # Package size, power rating and voltage rating per size code
+        self.size_fields = {
+            size_code: (package_size, power_rating,
+                        self.extracted_data['voltage_ratings'].get(package_size, DEFAULT_VOLTAGE_RATING))
+            for size_code, (package_size, power_rating) in SIZE_MAPPING.items()
+        }
         
-    def load_extracted_data(self):
+    @staticmethod
+    def load_extracted_data():
         """Load the extracted data from the PDF"""
         print("📂 Loading extracted RK73H data...")
         
@@ -38,6 +69,16 @@ class RK73HDataProvider:
             },
             'tolerance_options': ['±0.1%', '±0.25%', '±0.5%', '±1%', '±5%'],
             'voltage_rating': '50V to 200V (depending on size)',
+            'voltage_ratings': {
+                '0402': '50V',
+                '0603': '75V',
+                '0805': '150V',
+                '1206': '200V',
+                '1210': '200V',
+                '1812': '200V',
+                '2010': '200V',
+                '2512': '200V'
+            },
             
             # Temperature specifications
             'operating_temp': '-55°C to +155°C',
@@ -58,20 +99,26 @@ class RK73HDataProvider:
             # Termination
             'termination': 'Cu/Ni/Sn',
             'packaging': 'Tape & Reel',
+            'packaging_types': {
+                'TPL': 'Punch paper (2mm pitch)',
+                'TP': 'Punch paper (2mm pitch)',
+                'TD': 'Punch paper (4mm pitch)',
+                'TE': 'Embossed plastic (4mm pitch)'
+            },
+            'packaging_options': {
+                '1E': ['TP', 'TPL'],
+                '1J': ['TP', 'TD'],
+                '2A': ['TD', 'TE'],
+                '2B': ['TD', 'TE'],
+                '2F': ['TD', 'TE'],
+                '3A': ['TE'],
+                '3B': ['TE'],
+                '3C': ['TE']
+            },
             
             # Environmental
             'automotive_qualified': 'AEC-Q200',
-            'halogen_free': 'Yes',
-            
-            # Resistance codes (sample)
-            'resistance_codes': {
-                '1001': '1kΩ',
-                '1002': '10kΩ', 
-                '1003': '100kΩ',
-                '4731': '4.73kΩ',
-                '1000': '100Ω',
-                '1500': '150Ω'
-            }
+            'halogen_free': 'Yes'
         }
         
         return extracted_specs
@@ -79,13 +126,28 @@ class RK73HDataProvider:
     def load_template(self):
         """Load the template structure"""
         try:
-            template_df = pd.read_excel('test1.xlsx')
+            template_df = resources.get_template('test1.xlsx')
             return template_df
         except:
             # Create a default template if test1.xlsx is not available
             return self.create_default_template()
     
-    def create_default_template(self):
+    def template_constants(self):
+        """Template values that are the same for every part"""
+        extracted_data = self.extracted_data
+        return {
+            'Operating Temperature': extracted_data['operating_temp'],
+            'Temperature Coefficient': '±200 ppm/°C',  # Default
+            'Lead Finish': extracted_data['termination'],
+            'Technology': extracted_data['technology'],
+            'Series': extracted_data['series'],
+            'Automotive Qualified': extracted_data['automotive_qualified'],
+            'Environmental Compliance': 'Halogen-Free',
+            'Packaging Type': extracted_data['packaging']
+        }
+    
+    @staticmethod
+    def create_default_template():
         """Create a default template structure"""
         template_data = {
             'parameter': [
@@ -116,110 +178,56 @@ def decode_part_number(part_number):
     """
     Decode RK73H part number to extract specifications
     """
-    print(f"🔍 Decoding part number: {part_number}")
-    
-    decoded = {
-        'series': 'RK73H',
-        'size_code': '',
-        'resistance_code': '',
-        'tolerance_code': '',
-        'termination_code': '',
-        'packaging_code': ''
-    }
-    
-    # Clean the part number
-    clean_part = re.sub(r'\s+', '', part_number.upper())
+    progress(f"🔍 Decoding part number: {part_number}")
     
-    if clean_part.startswith('RK73H'):
-        # Extract size code (positions 6-7)
-        if len(clean_part) > 7:
-            decoded['size_code'] = clean_part[5:7]
-        
-        # Extract other codes based on typical RK73H structure
-        # This is based on the PDF structure analysis
-        parts = clean_part.split()
-        if len(parts) >= 4:
-            decoded['resistance_code'] = parts[2] if len(parts) > 2 else ''
-            decoded['tolerance_code'] = parts[3][0] if len(parts) > 3 else ''
-    
-    return decoded
+    return rk73h_decoder.decode_part_number(part_number)
 
+@timed('fill_template')
 def fill_template_with_part_data(part_number, data_provider):
     """
     Fill template with data for a specific part number
     """
-    print(f"📝 Filling template for: {part_number}")
-    
-    # Get template
-    template = data_provider.template.copy()
-    extracted_data = data_provider.extracted_data
+    progress(f"📝 Filling template for: {part_number}")
     
     # Decode part number
     decoded = decode_part_number(part_number)
     
-    # Get size-specific power rating
-    size_code = decoded['size_code']
-    power_rating = ''
-    package_size = ''
+    # Get size-specific package, power and voltage ratings
+    package_size, power_rating, voltage_rating = data_provider.size_fields.get(
+        decoded['size_code'], ('', '', DEFAULT_VOLTAGE_RATING))
     
-    # Map size codes to EIA codes and power ratings
-    size_mapping = {
-        '1E': ('0402', '0.063W'),
-        '1J': ('0603', '0.1W'),
-        '2A': ('0805', '0.125W'),
-        '2B': ('1206', '0.25W'),
-        '2F': ('1210', '0.5W'),
-        '3A': ('1812', '0.75W'),
-        '3B': ('2010', '0.75W'),
-        '3C': ('2512', '1W')
-    }
+    # Get resistance value (decoded from the EIA / R-notation code)
+    resistance_value = resistance.describe_code(decoded['resistance_code']) or 'See datasheet'
     
-    if size_code in size_mapping:
-        package_size, power_rating = size_mapping[size_code]
-    
-    # Get resistance value
-    resistance_code = decoded['resistance_code']
-    resistance_value = extracted_data['resistance_codes'].get(resistance_code, 'See datasheet')
-    
-    # Fill the template
-    parameter_values = {
+    # Fill the per-part fields; the constant ones are compiled into the template
+    return data_provider.compiled_template.fill({
         'Specifications': part_number,
         'Resistance': resistance_value,
-        'Maximum Working Voltage': '50V',  # Default, varies by size
-        'Tolerance': '±1%',  # Default
-        'Operating Temperature': extracted_data['operating_temp'],
+        'Maximum Working Voltage': voltage_rating,
+        'Tolerance': TOLERANCE_CODES.get(decoded['tolerance_code'], '±1%'),
         'Package Size': package_size,
-        'Rated Power per Element': power_rating,
-        'Temperature Coefficient': '±200 ppm/°C',  # Default
-        'Lead Finish': extracted_data['termination'],
-        'Technology': extracted_data['technology'],
-        'Series': extracted_data['series'],
-        'Automotive Qualified': extracted_data['automotive_qualified'],
-        'Environmental Compliance': 'Halogen-Free',
-        'Packaging Type': extracted_data['packaging']
-    }
-    
-    # Apply values to template
-    for idx, param in template['parameter'].items():
-        if pd.notna(param) and param in parameter_values:
-            template.at[idx, 'value'] = parameter_values[param]
-    
-    return template
+        'Rated Power per Element': power_rating
+    })
 
-def process_multiple_parts(part_numbers_list):
+def process_multiple_parts(part_numbers_list, sink=None):
     """
     Process multiple part numbers and create filled templates
+
+    If an OutputSink is given, each filled template is appended to it as
+    soon as it is ready and the number of rows written is returned;
+    otherwise the combined DataFrame is returned.
     """
     print("🚀 Starting batch processing...")
     print("=" * 50)
     
-    # Initialize data provider
-    data_provider = RK73HDataProvider()
+    # Shared data provider
+    data_provider = resources.get_data_provider()
     
     all_results = []
+    parts_done = 0
     
     for i, part_number in enumerate(part_numbers_list, 1):
-        print(f"\n[{i}/{len(part_numbers_list)}] Processing: {part_number}")
+        progress(f"\n[{i}/{len(part_numbers_list)}] Processing: {part_number}")
         
         # Fill template for this part
         filled_template = fill_template_with_part_data(part_number, data_provider)
@@ -228,17 +236,27 @@ def process_multiple_parts(part_numbers_list):
         filled_template.insert(0, 'Part_Number', part_number)
         
         # Add separator between parts
-        if len(all_results) > 0:
+        if parts_done > 0 and (sink is None or sink.wants_separators):
             separator = pd.DataFrame({
                 'Part_Number': [''],
                 'parameter': ['--- Next Part ---'],
                 'unit': [''],
                 'value': ['']
             })
-            all_results.append(separator)
+            if sink is None:
+                all_results.append(separator)
+            else:
+                sink.write(separator)
         
-        all_results.append(filled_template)
-        print(f"      ✅ Template filled successfully")
+        if sink is None:
+            all_results.append(filled_template)
+        else:
+            sink.write(filled_template)
+        parts_done += 1
+        progress(f"      ✅ Template filled successfully")
+    
+    if sink is not None:
+        return sink.rows_written
     
     # Combine all results
     if all_results:
@@ -248,17 +266,33 @@ def process_multiple_parts(part_numbers_list):
         print("❌ No results to combine")
         return pd.DataFrame()
 
-def save_filled_datasheet(result_df, filename=None):
+def filled_datasheet_filename(format='xlsx'):
+    """Default timestamped output file name"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return output_path(f"RK73H_Filled_Datasheet_{timestamp}", format)
+
+def open_filled_datasheet_sink(filename=None, format=None, lazy=False):
     """
-    Save the filled datasheet to Excel
+    Open the output sink for a filled datasheet (format from name or
+    extension); with lazy=True the file is only created once a row is written
     """
     if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"RK73H_Filled_Datasheet_{timestamp}.xlsx"
+        filename = filled_datasheet_filename(format or 'xlsx')
+    if sink_format(filename, format) == 'xlsx':
+        return open_sink(filename, 'xlsx', lazy=lazy, sheet_name='Filled_Specifications')
+    return open_sink(filename, format, lazy=lazy)
+
+def save_filled_datasheet(result_df, filename=None, format=None):
+    """
+    Save the filled datasheet (Excel by default, or CSV/JSONL/Parquet)
+    """
+    if filename is None:
+        filename = filled_datasheet_filename(format or 'xlsx')
     
     print(f"\n💾 Saving filled datasheet: {filename}")
     
-    result_df.to_excel(filename, index=False, sheet_name='Filled_Specifications')
+    with open_filled_datasheet_sink(filename, format) as sink:
+        sink.write(result_df)
     
     print(f"✅ Datasheet saved: {filename}")
     print(f"📊 Total rows: {len(result_df)}")
@@ -287,7 +321,7 @@ def get_user_input():
     return part_numbers
 
 # Main execution function
-def main():
+def main(format='xlsx'):
     """
     Main function to handle user input and generate filled datasheet
     """
@@ -316,11 +350,16 @@ def main():
     
     # Process the part numbers
     print(f"\n🔄 Processing {len(part_numbers)} part numbers...")
-    result = process_multiple_parts(part_numbers)
     
-    if not result.empty:
-        # Save the filled datasheet
-        output_file = save_filled_datasheet(result)
+    # Filled templates are streamed to the output as they are produced;
+    # the file is only created once there is something to write
+    output_file = filled_datasheet_filename(format)
+    with open_filled_datasheet_sink(output_file, format, lazy=True) as sink:
+        rows_written = process_multiple_parts(part_numbers, sink=sink)
+    
+    if rows_written:
+        print(f"\n💾 Filled datasheet saved: {output_file}")
+        print(f"📊 Total rows: {rows_written}")
         
         print(f"\n🎉 SUCCESS!")
         print(f"📁 Filled datasheet created: {output_file}")
@@ -332,4 +371,15 @@ def main():
         return None
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    from output_sinks import SINK_FORMATS
+
+    parser = argparse.ArgumentParser(description="RK73H datasheet generator")
+    parser.add_argument('--format', choices=SINK_FORMATS, default='xlsx',
+                        help="output format (default: xlsx)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    main(format=args.format)
+    instrumentation.finish(args)
@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+SERIES = 'RK73H'
+
+# Ordering code fields
+TERMINATION_CODES = {
+    'T': 'Sn (Lead-Free)',
+    'L': 'SnPb'
+}
+PACKAGING_CODES = ('TPL', 'TDD', 'TD', 'TP', 'TE', 'TK', 'TH', 'TC', 'TB')
+TOLERANCE_CODES = {
+    'B': '±0.1%',
+    'C': '±0.25%',
+    'D': '±0.5%',
+    'F': '±1%',
+    'G': '±2%',
+    'J': '±5%'
+}
+
+# Three or four digit EIA code, or an R-notation value such as 4R70 / R100
+_RESISTANCE = r'(?:\d{3,4}|\d{0,3}R\d{1,3})'
+_PACKAGING = '|'.join(sorted(PACKAGING_CODES, key=len, reverse=True))
+_TERMINATION = '[' + ''.join(TERMINATION_CODES) + ']'
+_TOLERANCE = '[' + ''.join(TOLERANCE_CODES) + ']'
+
+# Part numbers are matched with whitespace removed, in either order:
+#   catalog order:  RK73H 2B TD 1003 F T   (size, packaging, resistance, tolerance, termination)
+#   KOA order:      RK73H 2B T TD 1003 F   (size, termination, packaging, resistance, tolerance)
+PART_NUMBER_PATTERN = (
+    rf'^{SERIES}(?P<size_code>\d[A-Z])'
+    rf'(?:(?P<packaging_code>{_PACKAGING})(?P<resistance_code>{_RESISTANCE})'
+    rf'(?P<tolerance_code>{_TOLERANCE})(?P<termination_code>{_TERMINATION})?'
+    rf'|(?P<koa_termination_code>{_TERMINATION})?(?P<koa_packaging_code>{_PACKAGING})'
+    rf'(?P<koa_resistance_code>{_RESISTANCE})(?P<koa_tolerance_code>{_TOLERANCE}))$'
+)
+PART_NUMBER_RE = re.compile(PART_NUMBER_PATTERN)
+
+FIELDS = ('size_code', 'resistance_code', 'tolerance_code', 'termination_code', 'packaging_code')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _empty_decoding():
+    return {'series': SERIES, **dict.fromkeys(FIELDS, '')}
+
+
+@lru_cache(maxsize=65536)
+def _decode(clean_part):
+    decoded = _empty_decoding()
+    match = PART_NUMBER_RE.match(clean_part)
+    if match:
+        groups = match.groupdict()
+        for field in FIELDS:
+            decoded[field] = groups[field] or groups.get('koa_' + field) or ''
+    elif clean_part.startswith(SERIES) and len(clean_part) > 7:
+        # Not a complete ordering code: the size code is still positional
+        decoded['size_code'] = clean_part[5:7]
+    return decoded
+
+
+def decode_part_number(part_number):
+    """
+    Decode an RK73H part number into its ordering code fields:
+    series, size_code, resistance_code, tolerance_code, termination_code
+    and packaging_code ('' for fields that are not present).
+
+    Results are memoized, so repeated part numbers are decoded once.
+    """
+    return dict(_decode(_WHITESPACE.sub('', str(part_number).upper())))
+
+
+def decode_part_numbers(part_numbers):
+    """
+    Decode a Series/array/list of part numbers in one vectorized pass.
+
+    Returns a DataFrame with one row per part number (aligned with a
+    Series' index) and the same columns as decode_part_number. Each
+    distinct part number is matched once.
+    """
+    if isinstance(part_numbers, pd.Series):
+        index = part_numbers.index
+        values = part_numbers.to_numpy(dtype=object)
+    else:
+        values = np.asarray(part_numbers, dtype=object)
+        index = None
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    clean = (pd.Series(uniques, dtype=object).astype(str)
+             .str.upper()
+             .str.replace(r'\s+', '', regex=True))
+    extracted = clean.str.extract(PART_NUMBER_RE)
+
+    decoded = pd.DataFrame({'series': SERIES}, index=extracted.index)
+    for field in FIELDS:
+        values = extracted[field].to_numpy(dtype=object)
+        koa = 'koa_' + field
+        if koa in extracted:
+            missing = pd.isna(values)
+            values[missing] = extracted[koa].to_numpy(dtype=object)[missing]
+        values[pd.isna(values)] = ''
+        decoded[field] = values
+
+    # Incomplete codes still get the positional size code
+    partial = extracted['size_code'].isna() & clean.str.startswith(SERIES) & (clean.str.len() > 7)
+    decoded.loc[partial, 'size_code'] = clean[partial].str[5:7]
+
+    result = decoded.iloc[codes].reset_index(drop=True)
+    if index is not None:
+        result.index = index
+    return result
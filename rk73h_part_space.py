@@ -0,0 +1,212 @@
+import re
+
+from lazy_imports import lazy_import
+from resistance import encode_values, format_ohms, series_values
+from rk73h_datasheet_generator import RK73HDataProvider
+from rk73h_decoder import SERIES, TERMINATION_CODES, TOLERANCE_CODES, decode_part_numbers
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Tolerances looser than this are only offered in E24 values
+E96_MAX_TOLERANCE = 1.0
+
+TERMINATION_CODE = 'T'
+
+CATALOG_COLUMNS = [
+    'Part Number', 'Series', 'Size Code', 'EIA Code', 'Resistance', 'Resistance Code',
+    'Tolerance Code', 'Tolerance (%)', 'Termination Material Code', 'Termination Material',
+    'Packaging Code', 'Packaging Type', 'Power Rating (W)', 'Max Working Voltage (V)',
+    'Max Overload Voltage (V)', 'Resistance Range (Ω)', 'T.C.R. (ppm/°C)',
+    'AEC-Q200 Qualified', 'Notes'
+]
+
+_NUMBER = re.compile(r'[\d.]+')
+_OHMS = re.compile(r'([\d.]+)\s*([kM]?)Ω')
+_SCALE = {'': 1, 'k': 1e3, 'M': 1e6}
+
+
+def _number(text):
+    return float(_NUMBER.search(text).group())
+
+
+def _ohms(text):
+    value, scale = _OHMS.search(text).groups()
+    return float(value) * _SCALE[scale]
+
+
+class RK73HPartSpace:
+    """
+    The full RK73H ordering space (size × packaging × resistance ×
+    tolerance) as small integer-coded axis tables instead of a catalog
+    spreadsheet.
+
+    Every combination has a flat integer id (np.ravel_multi_index over
+    the axes); rows are materialized only for the ids asked for. Which
+    combinations exist, and their power and voltage ratings, come from the
+    size and code tables in RK73HDataProvider.load_extracted_data.
+
+    TCR is not part of the RK73H ordering code, so it is not an axis;
+    every row carries the series TCR.
+    """
+
+    def __init__(self, extracted_data=None):
+        if extracted_data is None:
+            extracted_data = RK73HDataProvider.load_extracted_data()
+        self.extracted_data = extracted_data
+
+        # Size axis
+        self.size_codes = np.array(list(extracted_data['package_sizes']))
+        self.eia_codes = np.array([extracted_data['package_sizes'][s].split()[0] for s in self.size_codes])
+        self.power_ratings = np.array([_number(extracted_data['power_ratings'][eia]) for eia in self.eia_codes])
+        self.working_voltages = np.array([int(_number(extracted_data['voltage_ratings'][eia]))
+                                          for eia in self.eia_codes])
+
+        # Packaging axis, and which packaging each size is offered in
+        self.packaging_codes = np.array(list(extracted_data['packaging_types']))
+        options = extracted_data['packaging_options']
+        self.packaging_valid = np.array([[p in options.get(s, ()) for p in self.packaging_codes]
+                                         for s in self.size_codes])
+
+        # Tolerance axis
+        codes_by_tolerance = {value: code for code, value in TOLERANCE_CODES.items()}
+        tolerances = [t for t in extracted_data['tolerance_options'] if t in codes_by_tolerance]
+        self.tolerance_codes = np.array([codes_by_tolerance[t] for t in tolerances])
+        self.tolerances = np.array(tolerances)
+        self.tolerance_e96 = np.array([_number(t) <= E96_MAX_TOLERANCE for t in tolerances])
+
+        # Resistance axis: E24 ∪ E96 values within the series resistance range
+        low, high = (_ohms(part) for part in re.split(r'\s+to\s+|\s*[–-]\s*', extracted_data['resistance_range']))
+        e24 = series_values('E24', low, high)
+        self.resistance_values = np.union1d(e24, series_values('E96', low, high))
+        self.resistance_codes = encode_values(self.resistance_values).astype(str)
+        self.resistance_e24 = np.isin(self.resistance_values, e24)
+
+        self.shape = (len(self.size_codes), len(self.packaging_codes),
+                      len(self.resistance_codes), len(self.tolerance_codes))
+        self.size = int(np.prod(self.shape))
+
+        self._axis_lookup = [
+            {code: i for i, code in enumerate(axis.tolist())}
+            for axis in (self.size_codes, self.packaging_codes, self.resistance_codes, self.tolerance_codes)
+        ]
+
+    def __len__(self):
+        """Number of valid parts"""
+        per_tolerance = np.where(self.tolerance_e96, len(self.resistance_codes), self.resistance_e24.sum())
+        return int(self.packaging_valid.sum() * per_tolerance.sum())
+
+    def __contains__(self, part_number):
+        return self.positions([part_number])[0] >= 0
+
+    def valid(self, ids):
+        """Boolean mask of which part ids are orderable combinations"""
+        size, packaging, resistance, tolerance = np.unravel_index(np.asarray(ids), self.shape)
+        return (self.packaging_valid[size, packaging]
+                & (self.tolerance_e96[tolerance] | self.resistance_e24[resistance]))
+
+    def iter_ids(self, chunk_size=100000):
+        """Yield the valid part ids in chunks, in id order"""
+        for start in range(0, self.size, chunk_size):
+            ids = np.arange(start, min(start + chunk_size, self.size))
+            yield ids[self.valid(ids)]
+
+    def iter_frames(self, chunk_size=100000):
+        """Yield the whole catalog as DataFrames of at most chunk_size rows"""
+        for ids in self.iter_ids(chunk_size):
+            if len(ids):
+                yield self.rows(ids)
+
+    def positions(self, part_numbers):
+        """
+        Part ids for a sequence of part numbers in one vectorized pass,
+        with -1 for part numbers that are not valid RK73H parts
+        """
+        decoded = decode_part_numbers(part_numbers)
+        axes = []
+        for field, lookup in zip(('size_code', 'packaging_code', 'resistance_code', 'tolerance_code'),
+                                 self._axis_lookup):
+            axes.append(decoded[field].map(lookup).fillna(-1).to_numpy(dtype=np.intp))
+        axes = np.array(axes)
+        known = (axes >= 0).all(axis=0)
+        # Only the series termination is orderable
+        known &= decoded['termination_code'].isin(['', TERMINATION_CODE]).to_numpy()
+
+        ids = np.full(len(decoded), -1, dtype=np.intp)
+        if known.any():
+            candidate = np.ravel_multi_index(tuple(axes[:, known]), self.shape)
+            ids[np.flatnonzero(known)] = np.where(self.valid(candidate), candidate, -1)
+        return ids
+
+    def part_numbers(self, ids):
+        """Catalog-style part numbers for part ids"""
+        size, packaging, resistance, tolerance = np.unravel_index(np.asarray(ids), self.shape)
+        return (SERIES + self.size_codes[size].astype(object) + ' '
+                + self.packaging_codes[packaging].astype(object) + ' '
+                + self.resistance_codes[resistance].astype(object) + ' '
+                + self.tolerance_codes[tolerance].astype(object) + TERMINATION_CODE)
+
+    def rows(self, ids):
+        """Materialize catalog rows (the RK73H_Full_Data.xlsx columns) for part ids"""
+        ids = np.asarray(ids)
+        size, packaging, resistance, tolerance = np.unravel_index(ids, self.shape)
+        extracted = self.extracted_data
+        voltages = self.working_voltages[size]
+        return pd.DataFrame({
+            'Part Number': self.part_numbers(ids),
+            'Series': SERIES,
+            'Size Code': self.size_codes[size],
+            'EIA Code': self.eia_codes[size],
+            'Resistance': format_ohms(self.resistance_values[resistance]),
+            'Resistance Code': self.resistance_codes[resistance],
+            'Tolerance Code': self.tolerance_codes[tolerance],
+            'Tolerance (%)': self.tolerances[tolerance],
+            'Termination Material Code': TERMINATION_CODE,
+            'Termination Material': TERMINATION_CODES[TERMINATION_CODE],
+            'Packaging Code': self.packaging_codes[packaging],
+            'Packaging Type': pd.Series(self.packaging_codes[packaging]).map(extracted['packaging_types']).to_numpy(),
+            'Power Rating (W)': self.power_ratings[size],
+            'Max Working Voltage (V)': voltages,
+            'Max Overload Voltage (V)': voltages * 2,
+            'Resistance Range (Ω)': extracted['resistance_range'].replace(' to ', ' – '),
+            'T.C.R. (ppm/°C)': re.sub(r'\s*ppm/°C$', '', extracted['tcr']).replace('/', ' / '),
+            'AEC-Q200 Qualified': 'Yes' if extracted['automotive_qualified'] else 'No',
+            'Notes': None
+        }, columns=CATALOG_COLUMNS)
+
+    def find(self, part_number):
+        """Catalog row (Series) for a part number, or None if it is not a valid part"""
+        part_id = self.positions([part_number])[0]
+        if part_id < 0:
+            return None
+        return self.rows([part_id]).iloc[0]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RK73H part space")
+    parser.add_argument('part_numbers', nargs='*', help="part numbers to look up")
+    parser.add_argument('--export', help="write every valid part to this file (xlsx/csv/jsonl/parquet)")
+    args = parser.parse_args()
+
+    space = RK73HPartSpace()
+    print(f"📋 RK73H part space: {len(space)} valid parts "
+          f"({' × '.join(str(n) for n in space.shape)} combinations)")
+
+    for part_number in args.part_numbers:
+        row = space.find(part_number)
+        if row is None:
+            print(f"❌ Not a valid RK73H part: {part_number}")
+        else:
+            print(f"\n✅ {row['Part Number']}")
+            for column, value in row.items():
+                print(f"  {column}: {value}")
+
+    if args.export:
+        from output_sinks import open_sink
+
+        with open_sink(args.export) as sink:
+            for frame in space.iter_frames():
+                sink.write(frame)
+        print(f"\n💾 Exported {sink.rows_written} parts to {args.export}")
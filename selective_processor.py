@@ -1,12 +1,25 @@
-import pandas as pd
-import numpy as np
+from batch_fill import batch_fill_template
+from compiled_template import compile_template
+import instrumentation
+from instrumentation import progress
+from lazy_imports import lazy_import
+from part_index import get_part_index
+from output_sinks import open_sink, output_path
+import resources
 
-# Load full data and test template
+pd = lazy_import('pandas')
+
+# Full data and test template, loaded on first use (see resources)
 full_data_path = 'RK73H_Full_Data.xlsx'
 test_template_path = 'test1.xlsx'
 
-full_data = pd.read_excel(full_data_path)
-test_template = pd.read_excel(test_template_path)
+def __getattr__(name):
+    """Lazily provide the module-level full_data and test_template"""
+    if name == 'full_data':
+        return resources.get_catalog(full_data_path)
+    if name == 'test_template':
+        return resources.get_template(test_template_path)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 # Define only the parameters you want to fill
 REQUIRED_PARAMETERS = {
@@ -17,56 +30,76 @@ REQUIRED_PARAMETERS = {
     "Rated Power per Element": "Power Rating (W)"
 }
 
-def get_selected_part_specs(part_numbers, test_template, full_data, required_params=REQUIRED_PARAMETERS):
+def get_selected_part_specs(part_numbers, test_template=None, full_data=None,
+                            required_params=REQUIRED_PARAMETERS, index=None,
+                            sink=None, chunk_size=10000):
     """
     Fill only the specified parameters in the template
+
+    test_template / full_data default to the shared, lazily loaded ones
+    index: PartIndex over full_data (the shared index is used if omitted)
+    sink: if given, parts are filled chunk_size at a time and appended to
+          this OutputSink; the number of rows written is returned instead
+          of a DataFrame
     """
-    output_frames = []
-
-    for part in part_numbers:
-        # Match the part number (exact match first, then contains match)
-        row = full_data[full_data['Part Number'] == part]
-        if row.empty:
-            # Try case-insensitive contains match
-            row = full_data[full_data['Part Number'].str.contains(part, case=False, na=False)]
-            if row.empty:
-                print(f"❌ Part number '{part}' not found.")
-                continue
-
-        row = row.iloc[0]  # Get the first match
-        print(f"✅ Found data for part number: {part}")
-
-        # Copy template
-        filled_template = test_template.copy()
-        
-        # Clean up the column name (remove trailing space)
-        if 'value ' in filled_template.columns:
-            filled_template = filled_template.rename(columns={'value ': 'value'})
-        
-        # Only fill the required parameters
-        for idx, param in filled_template["parameter"].items():
-            if pd.notna(param) and param in required_params:
-                column_name = required_params[param]
-                value = row.get(column_name, "")
-                filled_template.at[idx, 'value'] = value
-                print(f"  📝 {param}: {value}")
-
-        # Add part number as the first column
-        filled_template.insert(0, 'Part Number', part)
-        output_frames.append(filled_template)
-
-    # Merge all into one DataFrame
-    if output_frames:
-        final_output = pd.concat(output_frames, ignore_index=True)
-        return final_output
-    else:
+    # Generators are accepted: the part numbers are counted after filling
+    part_numbers = list(part_numbers)
+    if test_template is None:
+        test_template = resources.get_template(test_template_path)
+    if full_data is None:
+        full_data = resources.get_catalog(full_data_path)
+    if index is None:
+        index = get_part_index(full_data)
+
+    # Clean up the column name (remove trailing space)
+    if 'value ' in test_template.columns:
+        test_template = test_template.rename(columns={'value ': 'value'})
+    # Resolved once for every chunk
+    test_template = compile_template(test_template)
+
+    def fill(parts):
+        return batch_fill_template(
+            parts, test_template, full_data,
+            column_map=required_params,
+            part_column='Part Number',
+            index=index
+        )
+
+    if sink is not None:
+        missing_count = 0
+        for start in range(0, len(part_numbers), chunk_size):
+            chunk = part_numbers[start:start + chunk_size]
+            filled, missing = fill(chunk)
+            for part in missing:
+                progress(f"❌ Part number '{part}' not found.")
+            missing_count += len(missing)
+            sink.write(filled)
+        if not sink.rows_written:
+            print("❌ No valid part numbers found.")
+        else:
+            print(f"✅ Found data for {len(part_numbers) - missing_count} of {len(part_numbers)} part numbers")
+        return sink.rows_written
+
+    # Resolve every part in one pass and fill only the required parameters
+    final_output, missing = fill(part_numbers)
+
+    for part in missing:
+        progress(f"❌ Part number '{part}' not found.")
+
+    if final_output.empty:
         print("❌ No valid part numbers found.")
         return pd.DataFrame()
 
+    print(f"✅ Found data for {len(part_numbers) - len(missing)} of {len(part_numbers)} part numbers")
+    return final_output
+
 def customize_parameters():
     """
     Allow user to select which parameters to fill
     """
+    test_template = resources.get_template(test_template_path)
+    full_data = resources.get_catalog(full_data_path)
+    
     print("\n📋 Available parameters in template:")
     template_params = test_template['parameter'].dropna().tolist()
     
@@ -84,6 +117,16 @@ def customize_parameters():
 
 # Main execution
 if __name__ == "__main__":
+    import argparse
+    from output_sinks import SINK_FORMATS
+
+    parser = argparse.ArgumentParser(description="Selective part number data extraction")
+    parser.add_argument('--format', choices=SINK_FORMATS, default='xlsx',
+                        help="output format (default: xlsx)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
     print("🔍 Selective Part Number Data Extraction Tool")
     print("="*60)
     
@@ -101,15 +144,16 @@ if __name__ == "__main__":
     print(f"\n🔄 Processing {len(part_numbers_list)} part numbers...")
     
     # Generate the result with only selected parameters
-    result_df = get_selected_part_specs(part_numbers_list, test_template, full_data)
+    result_df = get_selected_part_specs(part_numbers_list)
     
     if not result_df.empty:
-        # Save to Excel
+        # Save in the chosen format
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"selected_specifications_{timestamp}.xlsx"
+        output_filename = output_path(f"selected_specifications_{timestamp}", args.format)
         
-        result_df.to_excel(output_filename, index=False)
+        with open_sink(output_filename, args.format) as sink:
+            sink.write(result_df)
         print(f"\n✅ Results saved to '{output_filename}'")
         print(f"📊 Total rows: {len(result_df)}")
         
@@ -120,3 +164,5 @@ if __name__ == "__main__":
             print(f"  {param}: {count} values filled")
     else:
         print("❌ No data to save.")
+    
+    instrumentation.finish(args)
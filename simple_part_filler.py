@@ -1,82 +1,96 @@
-import pandas as pd
+from batch_fill import batch_fill_template
+from compiled_template import CompiledTemplate
+import instrumentation
+from instrumentation import progress
+from lazy_imports import lazy_import
+from output_sinks import open_sink
+import resources
 
-def fill_specifications_from_part_numbers(part_numbers):
+pd = lazy_import('pandas')
+
+# Map data to template
+COLUMN_MAP = {
+    'Resistance': 'Resistance',
+    'Maximum Working Voltage': 'Max Working Voltage (V)',
+    'Tolerance': 'Tolerance (%)',
+    'Package Size': 'EIA Code',
+    'Rated Power per Element': 'Power Rating (W)',
+    'Temperature Coefficient': 'T.C.R. (ppm/°C)',
+    'Lead Finish': 'Termination Material'
+}
+CONSTANT_MAP = {
+    'Operating Temperature': '-55°C to +155°C',
+    'Technology': 'Thick Film'
+}
+
+def load_template(path='test1.xlsx'):
+    """The template with its columns named parameter, unit and value"""
+    # Clean column names (on a copy, the loaded template is shared)
+    return resources.get_template(path).set_axis(['parameter', 'unit', 'value'], axis=1)
+
+def part_separator():
+    """Separator rows between parts"""
+    return pd.DataFrame({
+        'parameter': ['', '--- Next Part ---', ''],
+        'unit': ['', '', ''],
+        'value': ['', '', '']
+    })
+
+def fill_specifications_from_part_numbers(part_numbers, output_file='filled_specifications.xlsx',
+                                          format=None, chunk_size=10000):
     """
     Main function to fill test1.xlsx template with data from RK73H_Full_Data.xlsx
     
     Args:
         part_numbers (list): List of part numbers to process
+        output_file (str): Output path; the format follows its extension
+        format (str): Force an output format (xlsx, csv, jsonl, parquet)
+        chunk_size (int): Parts filled and written per chunk
     
     Returns:
-        str: Filename of the created Excel file
+        str: Filename of the created file
     """
     
     # Load data files
     print("📂 Loading data files...")
-    full_data = pd.read_excel('RK73H_Full_Data.xlsx')
-    template = pd.read_excel('test1.xlsx')
+    full_data = resources.get_catalog('RK73H_Full_Data.xlsx')
+    template = load_template('test1.xlsx')
     
-    # Clean column names
-    template.columns = ['parameter', 'unit', 'value']
+    separator = part_separator()
     
-    all_results = []
+    # Constant fields are written into the template once, not per chunk
+    template = CompiledTemplate(template, CONSTANT_MAP)
     
-    for i, part_number in enumerate(part_numbers, 1):
-        print(f"[{i}/{len(part_numbers)}] Processing: {part_number}")
-        
-        # Find part in database
-        part_row = full_data[full_data['Part Number'] == part_number]
-        
-        if part_row.empty:
-            print(f"   ❌ Not found: {part_number}")
-            continue
+    # Find the parts in the database (exact match only), fill them a chunk
+    # at a time and append each chunk to the output
+    part_numbers = list(part_numbers)
+    missing_count = 0
+    # Created on the first found part, so no file is left when nothing matches
+    with open_sink(output_file, format, lazy=True) as sink:
+        for start in range(0, len(part_numbers), chunk_size):
+            chunk_result, missing = batch_fill_template(
+                part_numbers[start:start + chunk_size], template, full_data,
+                column_map=COLUMN_MAP,
+                part_number_param='Specifications',
+                separator=separator if sink.wants_separators else None,
+                partial=False
+            )
             
-        part_data = part_row.iloc[0]
-        print(f"   ✅ Found: {part_number}")
-        
-        # Create filled template
-        filled = template.copy()
-        
-        # Map data to template
-        data_mapping = {
-            'Specifications': part_number,
-            'Resistance': part_data.get('Resistance', ''),
-            'Maximum Working Voltage': part_data.get('Max Working Voltage (V)', ''),
-            'Tolerance': part_data.get('Tolerance (%)', ''),
-            'Operating Temperature': '-55°C to +155°C',
-            'Package Size': part_data.get('EIA Code', ''),
-            'Rated Power per Element': part_data.get('Power Rating (W)', ''),
-            'Temperature Coefficient': part_data.get('T.C.R. (ppm/°C)', ''),
-            'Lead Finish': part_data.get('Termination Material', ''),
-            'Technology': 'Thick Film'
-        }
-        
-        # Fill values
-        for idx, param in filled['parameter'].items():
-            if pd.notna(param) and param in data_mapping:
-                filled.at[idx, 'value'] = data_mapping[param]
-        
-        # Add separator between parts
-        if len(all_results) > 0:
-            separator = pd.DataFrame({
-                'parameter': ['', '--- Next Part ---', ''],
-                'unit': ['', '', ''],
-                'value': ['', '', '']
-            })
-            all_results.append(separator)
-        
-        all_results.append(filled)
+            for part_number in missing:
+                progress(f"   ❌ Not found: {part_number}")
+            missing_count += len(missing)
+            
+            if not chunk_result.empty:
+                # Separator between the last part of one chunk and the next
+                if sink.wants_separators and sink.rows_written:
+                    sink.write(separator)
+                sink.write(chunk_result)
+        rows_written = sink.rows_written
+    print(f"   ✅ Found: {len(part_numbers) - missing_count} of {len(part_numbers)} part numbers")
     
-    # Combine all results
-    if all_results:
-        final_result = pd.concat(all_results, ignore_index=True)
-        
-        # Save to Excel
-        output_file = 'filled_specifications.xlsx'
-        final_result.to_excel(output_file, index=False)
-        
+    if rows_written:
         print(f"\n✅ Saved to: {output_file}")
-        print(f"📊 Total rows: {len(final_result)}")
+        print(f"📊 Total rows: {rows_written}")
         
         return output_file
     else:
@@ -85,6 +99,18 @@ def fill_specifications_from_part_numbers(part_numbers):
 
 # Example usage:
 if __name__ == "__main__":
+    import argparse
+    from output_sinks import SINK_FORMATS
+
+    parser = argparse.ArgumentParser(description="Fill test1.xlsx for a list of part numbers")
+    parser.add_argument('--output', default='filled_specifications.xlsx',
+                        help="output file (format follows the extension)")
+    parser.add_argument('--format', choices=SINK_FORMATS,
+                        help="output format, overriding the extension")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
     # Enter your part numbers here
     my_part_numbers = [
         "RK73H2B TD 1003 FT",
@@ -92,9 +118,11 @@ if __name__ == "__main__":
     ]
     
     # Process the part numbers
-    result_file = fill_specifications_from_part_numbers(my_part_numbers)
+    result_file = fill_specifications_from_part_numbers(my_part_numbers, args.output, args.format)
     
     if result_file:
         print(f"\n🎉 Success! Check the file: {result_file}")
     else:
         print("\n❌ Failed to process any parts")
+    
+    instrumentation.finish(args)
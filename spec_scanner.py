@@ -0,0 +1,270 @@
+import re
+
+_QUANTIFIERS = '?*+{'
+
+
+def _has_top_level_alternation(pattern):
+    """Whether the pattern has a '|' outside any group or character class"""
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+            # A ']' right after '[' or '[^' is a literal member of the class
+            if pattern[i + 1:i + 2] == '^':
+                i += 1
+            if pattern[i + 1:i + 2] == ']':
+                i += 1
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def leading_literal(pattern):
+    """
+    Return the literal text a regex pattern always starts with, up to the
+    first space or regex construct ('' if it has none). Patterns that start
+    with a group or inline flag, or that have a top-level alternation, have
+    no such text: any branch may match first.
+    """
+    if pattern.startswith('(') or _has_top_level_alternation(pattern):
+        return ''
+    literal = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\' and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            char, step = pattern[i + 1], 2
+        elif ch.isalnum():
+            char, step = ch, 1
+        else:
+            break
+        # A quantified character is optional, so it cannot be part of the anchor
+        if i + step < len(pattern) and pattern[i + step] in _QUANTIFIERS:
+            break
+        literal.append(char)
+        i += step
+    return ''.join(literal)
+
+
+def _trie_regex(words):
+    """
+    Build a regex alternation of `words` factored as a prefix trie, so each
+    text position is tested in time proportional to the word length rather
+    than the number of words. Longer words win over their own prefixes.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child)
+                    for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+def _findall_value(match):
+    """Return what re.findall would return for this match"""
+    groups = match.groups()
+    if not groups:
+        return match.group(0)
+    if len(groups) == 1:
+        return groups[0] if groups[0] is not None else ''
+    return tuple(g if g is not None else '' for g in groups)
+
+
+class SpecScanner:
+    """
+    Matches a library of spec patterns against a text in a single pass.
+
+    Every registered pattern is anchored on the literal keyword it starts
+    with (derived automatically, or given explicitly). One compiled prefix
+    trie over all anchor keywords locates candidate positions, and only the
+    patterns whose keyword occurs at a position are tried there. Results are
+    the same as running re.findall for every pattern, grouped per spec name,
+    but the text is swept once however many patterns are registered.
+
+    Patterns without a leading keyword fall back to their own findall sweep.
+    Registering the same pattern under several names matches it only once.
+    """
+
+    def __init__(self):
+        self._names = []
+        self._patterns = {}      # (pattern, flags) -> compiled regex
+        self._pattern_names = {} # (pattern, flags) -> [names]
+        self._anchors = {}       # (pattern, flags) -> anchor keyword or ''
+        self._compiled = None
+
+    def register(self, name, pattern, flags=re.IGNORECASE, anchor=None):
+        """
+        Register a pattern under a spec name. `anchor` overrides the keyword
+        derived from the start of the pattern; pass '' to disable anchoring.
+        """
+        if anchor is None:
+            anchor = leading_literal(pattern).split(' ')[0]
+        key = (pattern, flags)
+        if key not in self._patterns:
+            self._patterns[key] = re.compile(pattern, flags)
+            self._pattern_names[key] = []
+            self._anchors[key] = anchor.casefold()
+        self._pattern_names[key].append(name)
+        if name not in self._names:
+            self._names.append(name)
+        self._compiled = None
+        return self
+
+    @property
+    def names(self):
+        """Registered spec names in registration order"""
+        return list(self._names)
+
+    def _compile(self):
+        by_anchor = {}
+        unanchored = []
+        for key, anchor in self._anchors.items():
+            if anchor:
+                by_anchor.setdefault(anchor, []).append(key)
+            else:
+                unanchored.append(key)
+
+        # A hit on a keyword also triggers patterns anchored on its prefixes
+        candidates = {}
+        for anchor in by_anchor:
+            keys = []
+            for other, other_keys in by_anchor.items():
+                if anchor.startswith(other):
+                    keys.extend(other_keys)
+            candidates[anchor] = keys
+
+        prefilter = None
+        if by_anchor:
+            prefilter = re.compile('(?=(' + _trie_regex(by_anchor) + '))', re.IGNORECASE)
+        self._compiled = (prefilter, candidates, unanchored)
+
+    def new_results(self):
+        """Empty result dict: spec name -> list of matches"""
+        return {name: [] for name in self._names}
+
+    def scan_into(self, text, results):
+        """Scan `text` and append matches to `results` (see new_results)"""
+        if self._compiled is None:
+            self._compile()
+        prefilter, candidates, unanchored = self._compiled
+
+        found = {key: [] for key in self._patterns}
+        if prefilter is not None:
+            next_start = {}
+            for hit in prefilter.finditer(text):
+                pos = hit.start()
+                # IGNORECASE also matches case-fold variants such as 'ſ' for 's'
+                # or the Kelvin sign for 'k', which casefold() maps back
+                for key in candidates.get(hit.group(1).casefold(), ()):
+                    if pos < next_start.get(key, 0):
+                        continue
+                    match = self._patterns[key].match(text, pos)
+                    if match:
+                        found[key].append(_findall_value(match))
+                        next_start[key] = match.end() if match.end() > pos else pos + 1
+
+        for key in unanchored:
+            found[key] = self._patterns[key].findall(text)
+
+        for key, matches in found.items():
+            if matches:
+                for name in self._pattern_names[key]:
+                    results[name].extend(matches)
+        return results
+
+    def scan(self, text):
+        """Scan `text` and return a dict of spec name -> list of matches"""
+        return self.scan_into(text, self.new_results())
+
+
+def check_equivalence(patterns, texts, flags=re.IGNORECASE):
+    """
+    Scan texts with a SpecScanner of patterns (name -> pattern) and compare
+    with re.findall per pattern. Returns a list of (name, text, scanned,
+    expected) for every mismatch.
+    """
+    scanner = SpecScanner()
+    for name, pattern in patterns.items():
+        scanner.register(name, pattern, flags)
+    mismatches = []
+    for text in texts:
+        results = scanner.scan(text)
+        for name, pattern in patterns.items():
+            expected = re.findall(pattern, text, flags)
+            if results[name] != expected:
+                mismatches.append((name, text, results[name], expected))
+    return mismatches
+
+
+# Patterns whose anchoring is easy to get wrong: alternation, leading groups and flags
+_TRICKY_PATTERNS = {
+    'alternation': r'Power|Voltage',
+    'alternation_after_literal': r'Rated (?:power)|Voltage\s*(\d+)V',
+    'grouped_alternation': r'(?:Power|Voltage)\s*(\d+)',
+    'leading_group': r'(Res)istance\s*(\d+)',
+    'inline_flag': r'(?i)tolerance\s*([\d.]+)%',
+    'class_with_bar': r'Size[|:]\s*(\w+)',
+    'escaped_bar': r'Size\|(\w+)',
+}
+
+_CHECK_TEXTS = [
+    'Voltage 50V and Power 1W',
+    'RK73H2B TD 1003 FT RK73H1E TPL 4731 DT Resistance Range: 1Ω - 10MΩ\\nPower Rating: 0.25W',
+    'Tolerance: ±1% Temperature Coefficient: ±200 ppm/°C Length: 3.2 mm 3.2 × 1.6 × 0.55 mm',
+    'Rated power 0.25W, Voltage 200V, Power 1W',
+    'Resistance 100 ohm, Tolerance 1%, Size|0805 Size: 1206',
+    'Reſistance 5 Ω, \u212aelvin 1 \u212a, Power 1\u212a',
+    '',
+]
+
+
+if __name__ == "__main__":
+    import pdf_data_extractor
+    from pdf_extractor import SPEC_PATTERNS
+
+    checks = [('pdf_extractor SPEC_PATTERNS', SPEC_PATTERNS, re.IGNORECASE),
+              ('tricky patterns', _TRICKY_PATTERNS, re.IGNORECASE)]
+    for label, patterns, flags in (('SPEC_PATTERNS', pdf_data_extractor.SPEC_PATTERNS, re.IGNORECASE),
+                                   ('PART_PATTERNS', pdf_data_extractor.PART_PATTERNS, 0),
+                                   ('ELECTRICAL_PATTERNS', pdf_data_extractor.ELECTRICAL_PATTERNS, re.IGNORECASE),
+                                   ('DIM_PATTERNS', pdf_data_extractor.DIM_PATTERNS, re.IGNORECASE)):
+        checks.append((f'pdf_data_extractor {label}', {pattern: pattern for pattern in patterns}, flags))
+
+    texts = _CHECK_TEXTS + [' '.join(_CHECK_TEXTS)]
+    failed = False
+    for label, patterns, flags in checks:
+        mismatches = check_equivalence(patterns, texts, flags)
+        if mismatches:
+            failed = True
+            print(f"❌ {label}: {len(mismatches)} mismatches")
+            for name, text, scanned, expected in mismatches[:10]:
+                print(f"   {name} on {text!r}: {scanned} != {expected}")
+        else:
+            print(f"✅ {label}: {len(patterns)} patterns match re.findall")
+    raise SystemExit(1 if failed else 0)
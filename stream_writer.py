@@ -0,0 +1,138 @@
+import math
+
+from instrumentation import count
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+xlsxwriter = lazy_import('xlsxwriter')
+
+# Excel limits
+MAX_SHEET_NAME = 31
+MAX_ROWS = 1048576
+
+_INFINITIES = (float('inf'), float('-inf'))
+
+
+def _cell(value):
+    """Plain Python value for a cell, or None for a blank cell"""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if value is pd.NaT:
+        return None
+    return value
+
+
+class StreamingExcelWriter:
+    """
+    XLSX writer that streams rows to disk with xlsxwriter's constant_memory
+    mode, so only the current row is held in memory however large the
+    sheet gets. Sheets are written one at a time, each from an iterable of
+    chunks (DataFrames or lists of row tuples), e.g. a generator.
+
+        with StreamingExcelWriter('out.xlsx') as writer:
+            writer.write_sheet('Parts', ['Part Number', 'value'], chunks)
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.workbook = xlsxwriter.Workbook(filename, {
+            'constant_memory': True,
+            # Write cell text verbatim, as pandas does
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+            'strings_to_numbers': False
+        })
+        self.header_format = self.workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+        self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def add_sheet(self, sheet_name, columns):
+        """
+        Add a sheet with a header row and return a SheetStream that rows
+        can be appended to. In constant_memory mode a sheet must be
+        finished before the next one is started.
+        """
+        worksheet = self.workbook.add_worksheet(sheet_name[:MAX_SHEET_NAME])
+        for col, name in enumerate(columns):
+            worksheet.write(0, col, '' if name is None else str(name), self.header_format)
+        return SheetStream(self, worksheet, list(columns))
+
+    def write_sheet(self, sheet_name, columns, chunks):
+        """
+        Add a sheet with a header row and stream all chunks into it.
+        Returns the number of data rows written.
+        """
+        sheet = self.add_sheet(sheet_name, columns)
+        for chunk in chunks:
+            sheet.append(chunk)
+        return sheet.rows
+
+    def write_frame(self, sheet_name, df, index=False, chunk_size=50000):
+        """Stream a DataFrame into a sheet in row chunks"""
+        if index:
+            df = df.reset_index()
+            df.columns = [''] + list(df.columns[1:])
+        chunks = (df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+        return self.write_sheet(sheet_name, list(df.columns), chunks)
+
+
+class SheetStream:
+    """One worksheet of a StreamingExcelWriter, appended to chunk by chunk"""
+
+    def __init__(self, writer, worksheet, columns):
+        self.writer = writer
+        self.worksheet = worksheet
+        self.columns = columns
+        self.rows = 0
+
+    def append(self, chunk):
+        """Append a chunk (DataFrame or iterable of row tuples) to the sheet"""
+        if isinstance(chunk, pd.DataFrame):
+            chunk = zip(*(chunk.iloc[:, i].tolist() for i in range(chunk.shape[1])))
+
+        worksheet = self.worksheet
+        write_string = worksheet.write_string
+        write_number = worksheet.write_number
+        row = self.rows + 1
+        for values in chunk:
+            if row >= MAX_ROWS:
+                raise ValueError(f"Sheet '{worksheet.name}' exceeds Excel's {MAX_ROWS} row limit")
+            for col, value in enumerate(values):
+                # Fast paths for the common cell types, generic write otherwise
+                kind = type(value)
+                if kind is str:
+                    write_string(row, col, value)
+                elif kind is int or kind is float:
+                    if value == value and value not in _INFINITIES:
+                        write_number(row, col, value)
+                elif value is not None:
+                    value = _cell(value)
+                    if value is not None:
+                        worksheet.write(row, col, value)
+            row += 1
+
+        written = row - 1 - self.rows
+        self.rows = row - 1
+        self.writer.rows_written += written
+        count('rows_written', written)
+        return written
+
+
+def write_frame(df, filename, sheet_name='Sheet1', index=False):
+    """Write a single DataFrame to an XLSX file with constant memory"""
+    with StreamingExcelWriter(filename) as writer:
+        writer.write_frame(sheet_name, df, index=index)
+    return filename
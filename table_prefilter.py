@@ -0,0 +1,99 @@
+import re
+
+from instrumentation import METRICS
+
+# Bump when the classifier changes, so pages it skipped are re-extracted
+TABLE_PREFILTER_VERSION = '1'
+
+# pdfplumber's default extract_tables() settings find tables from ruling
+# lines only ('lines' strategy) and ignore edges shorter than this
+EDGE_MIN_LENGTH = 3
+
+# Both extractors drop tables with fewer than two rows, which takes at
+# least three horizontal and two vertical rulings
+MIN_HORIZONTAL_EDGES = 3
+MIN_VERTICAL_EDGES = 2
+
+# Content stream operators that draw rulings: rectangles and line segments
+_RECT_OP = re.compile(rb'(?<![A-Za-z])re(?![A-Za-z])')
+_LINE_OP = re.compile(rb'(?<![A-Za-z])l(?![A-Za-z])')
+
+
+def _long_edges(edges):
+    return sum(1 for edge in edges
+               if max(edge['x1'] - edge['x0'], edge['bottom'] - edge['top']) >= EDGE_MIN_LENGTH)
+
+
+def plumber_page_may_have_tables(page):
+    """
+    Whether a pdfplumber page has enough ruling edges (from lines, rects
+    and curves) to hold a table of two or more rows
+    """
+    return (_long_edges(page.horizontal_edges) >= MIN_HORIZONTAL_EDGES
+            and _long_edges(page.vertical_edges) >= MIN_VERTICAL_EDGES)
+
+
+def _content_bytes(page):
+    contents = page.get_contents()
+    if contents is None:
+        return b''
+    streams = contents if isinstance(contents, list) else [contents]
+    return b'\n'.join(stream.get_object().get_data() for stream in streams)
+
+
+def _has_form_xobjects(page):
+    resources = page.get('/Resources')
+    xobjects = resources.get_object().get('/XObject') if resources else None
+    if not xobjects:
+        return False
+    return any(xobject.get_object().get('/Subtype') == '/Form'
+               for xobject in xobjects.get_object().values())
+
+
+def pypdf2_page_may_have_tables(page):
+    """
+    Whether a PyPDF2 page draws enough rulings to hold a table, judged from
+    the operators in its content stream without laying the page out.
+
+    Each rectangle can contribute four edges and each line segment one.
+    Pages drawing through form XObjects are always treated as candidates,
+    since their drawing operators are not in the page's own stream.
+    """
+    if _has_form_xobjects(page):
+        return True
+    data = _content_bytes(page)
+    possible_edges = 4 * len(_RECT_OP.findall(data)) + len(_LINE_OP.findall(data))
+    return possible_edges >= MIN_HORIZONTAL_EDGES + MIN_VERTICAL_EDGES
+
+
+def may_have_tables(plumber_page=None, text_page=None):
+    """
+    Cheap check run before extract_tables(). Uses the PyPDF2 page when one
+    is given (so pdfplumber is not needed at all for pages that are
+    skipped), otherwise the pdfplumber page's ruling edges. Records the
+    outcome in the table_prefilter counters.
+    """
+    if text_page is not None:
+        likely = pypdf2_page_may_have_tables(text_page)
+    else:
+        likely = plumber_page_may_have_tables(plumber_page)
+    METRICS.count('table_prefilter.checked')
+    if not likely:
+        METRICS.count('table_prefilter.skipped')
+    return likely
+
+
+def prefilter_counts():
+    """(pages checked, pages skipped) so far in this process"""
+    counters = METRICS.state()['counters']
+    return counters.get('table_prefilter.checked', 0), counters.get('table_prefilter.skipped', 0)
+
+
+def skip_summary(before=(0, 0)):
+    """One-line summary of the pages skipped since `before` (a prefilter_counts result)"""
+    checked, skipped = prefilter_counts()
+    checked -= before[0]
+    skipped -= before[1]
+    if not checked:
+        return None
+    return f"🧮 Table prefilter: skipped {skipped} of {checked} pages ({skipped / checked:.0%})"
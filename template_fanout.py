@@ -0,0 +1,200 @@
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from batch_fill import mapped_values, resolve_parts
+from compiled_template import compile_template
+import instrumentation
+from instrumentation import count, progress, stage
+from output_sinks import open_sink
+import resources
+
+# Chunks filled ahead of the slowest output; bounds memory when one output is slow
+MAX_PENDING_CHUNKS = 2
+
+
+class TemplateTarget:
+    """
+    One output of a fan-out fill: a template with its own mapping, and the
+    file it is written to. The arguments are those of batch_fill_template;
+    constant_map is compiled into the template.
+    """
+
+    def __init__(self, template, output, column_map=None, constant_map=None, part_number_param=None,
+                 part_column=None, separator=None, format=None):
+        self.template = compile_template(template, constant_map)
+        self.output = output
+        self.column_map = column_map or {}
+        self.part_number_param = part_number_param
+        self.part_column = part_column
+        self.separator = separator
+        self.format = format
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Target from a JSON object: {"preset": "selective" | "simple",
+        "output": ...} or {"template": path, "output": ..., "column_map":
+        {...}, "constant_map": {...}, "part_number_param": ...,
+        "part_column": ..., "separator": true, "format": ...}
+        """
+        spec = dict(spec)
+        if 'preset' in spec:
+            preset = spec.pop('preset')
+            if preset not in TARGET_PRESETS:
+                raise ValueError(f"Unknown preset '{preset}' (choose from {', '.join(TARGET_PRESETS)})")
+            return TARGET_PRESETS[preset](**spec)
+
+        template = resources.get_template(spec.pop('template'))
+        if 'value ' in template.columns:
+            template = template.rename(columns={'value ': 'value'})
+        if spec.pop('separator', False):
+            from simple_part_filler import part_separator
+            spec['separator'] = part_separator().reindex(columns=template.columns, fill_value='')
+        return cls(template, **spec)
+
+    def columns_needed(self, catalog):
+        """Catalog columns this target reads"""
+        return {column for param, column in self.column_map.items()
+                if param in self.template and column in catalog.columns}
+
+
+def selective_target(output, format=None):
+    """Target filling like selective_processor (REQUIRED_PARAMETERS, part number column)"""
+    from selective_processor import REQUIRED_PARAMETERS, test_template_path
+
+    template = resources.get_template(test_template_path)
+    if 'value ' in template.columns:
+        template = template.rename(columns={'value ': 'value'})
+    return TemplateTarget(template, output, column_map=REQUIRED_PARAMETERS, part_column='Part Number',
+                          format=format)
+
+
+def simple_target(output, format=None):
+    """Target filling like simple_part_filler (its column and constant maps, separators)"""
+    from simple_part_filler import COLUMN_MAP, CONSTANT_MAP, load_template, part_separator
+
+    return TemplateTarget(load_template(), output, column_map=COLUMN_MAP, constant_map=CONSTANT_MAP,
+                          part_number_param='Specifications', separator=part_separator(),
+                          format=format)
+
+
+TARGET_PRESETS = {'selective': selective_target, 'simple': simple_target}
+
+
+def _fill_and_write(target, sink, parts, rows, catalog, columns):
+    """Fill one chunk into one target and append it to the target's sink"""
+    separator = target.separator if sink.wants_separators else None
+    values = mapped_values(target.template, parts, rows, catalog, target.column_map,
+                           target.part_number_param, columns)
+    filled = target.template.fill_many(len(parts), values, separator, target.part_column, parts)
+    count('rows_filled', len(filled))
+    # Separator between the last part of one chunk and the next
+    if separator is not None and sink.rows_written:
+        sink.write(separator)
+    sink.write(filled)
+
+
+def fan_out_fill(part_numbers, targets, catalog=None, index=None, partial=True, chunk_size=10000):
+    """
+    Fill several templates for the same parts, resolving each part once.
+
+    Parts are processed chunk_size at a time: each chunk is resolved
+    against the catalog in one pass and the catalog columns any target
+    reads are gathered once, then every target fills its template from
+    those and appends to its own output. Each output has a writer thread,
+    so outputs are filled and written in parallel with each other and
+    with resolving the next chunk.
+
+    partial applies to the shared lookup, so it is the same for every
+    target. Returns ({output: rows written}, list of part numbers not
+    found).
+    """
+    if catalog is None:
+        catalog = resources.get_catalog()
+    part_numbers = list(part_numbers)
+    needed = set().union(*(target.columns_needed(catalog) for target in targets))
+    # Object arrays of the catalog columns, converted once for every chunk
+    catalog_columns = {column: catalog[column].to_numpy(dtype=object) for column in needed}
+
+    missing = []
+    with ExitStack() as stack:
+        # Outputs are only created once a part is found
+        sinks = [stack.enter_context(open_sink(target.output, target.format, lazy=True)) for target in targets]
+        writers = [stack.enter_context(ThreadPoolExecutor(max_workers=1)) for _ in targets]
+        pending = deque()
+        for start in range(0, len(part_numbers), chunk_size):
+            with stage('fanout_resolve'):
+                parts, rows, chunk_missing = resolve_parts(part_numbers[start:start + chunk_size],
+                                                           catalog, index, partial)
+                columns = {column: values[rows] for column, values in catalog_columns.items()}
+            count('parts_filled', len(parts))
+            count('parts_missing', len(chunk_missing))
+            for part in chunk_missing:
+                progress(f"   ❌ Not found: {part}")
+            missing.extend(chunk_missing)
+            if not len(parts):
+                continue
+
+            pending.append([writer.submit(_fill_and_write, target, sink, parts, rows, catalog, columns)
+                            for target, sink, writer in zip(targets, sinks, writers)])
+            while len(pending) > MAX_PENDING_CHUNKS:
+                for future in pending.popleft():
+                    future.result()
+        while pending:
+            for future in pending.popleft():
+                future.result()
+
+    return {target.output: sink.rows_written for target, sink in zip(targets, sinks)}, missing
+
+
+def parse_targets(text):
+    """Targets from 'PRESET=OUTPUT' (e.g. simple=out.csv) or a JSON file of target specs"""
+    if '=' in text:
+        preset, output = text.split('=', 1)
+        return [TemplateTarget.from_spec({'preset': preset, 'output': output})]
+    with open(text, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    specs = spec if isinstance(spec, list) else spec.get('targets', [spec])
+    return [TemplateTarget.from_spec(item) for item in specs]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fill several templates for the same part numbers in one lookup pass")
+    parser.add_argument('parts', nargs='*', help="part numbers")
+    parser.add_argument('--parts-file', help="file with one part number per line")
+    parser.add_argument('--target', action='append', required=True, metavar='PRESET=OUTPUT|SPEC.json',
+                        help=f"an output: a preset ({', '.join(TARGET_PRESETS)}) and output file, or a "
+                             "JSON file of target specs (see TemplateTarget.from_spec); repeat for more")
+    parser.add_argument('--catalog', default=resources.CATALOG_PATH, help="catalog to look parts up in")
+    parser.add_argument('--exact', action='store_true', help="exact part number matches only")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="parts resolved and written per chunk")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    part_numbers = list(args.parts)
+    if args.parts_file:
+        with open(args.parts_file, 'r', encoding='utf-8') as f:
+            part_numbers.extend(line.strip() for line in f if line.strip())
+    if not part_numbers:
+        parser.error("no part numbers given")
+
+    try:
+        targets = [target for text in args.target for target in parse_targets(text)]
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    outputs = [target.output for target in targets]
+    if len(set(outputs)) != len(outputs):
+        parser.error("each target needs its own output file")
+
+    print(f"🔀 Filling {len(targets)} templates for {len(part_numbers)} part numbers")
+    written, missing = fan_out_fill(part_numbers, targets, resources.get_catalog(args.catalog),
+                                    partial=not args.exact, chunk_size=args.chunk_size)
+    print(f"   ✅ Found: {len(part_numbers) - len(missing)} of {len(part_numbers)} part numbers")
+    for target in targets:
+        print(f"💾 {target.output}: {written[target.output]} rows")
+    instrumentation.finish(args)